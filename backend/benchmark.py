@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+SeuBank Backend Benchmarks
+Seeds a scratch database and times the server code paths directly, without HTTP.
+
+Usage:
+    python backend/benchmark.py admin-users --counts 10 100 1000
+    python backend/benchmark.py admin-stats --counts 10000 100000 1000000
+    python backend/benchmark.py batch-transfer --counts 100 1000
+    python backend/benchmark.py statement-export --counts 1000000
+    python backend/benchmark.py serialization --counts 1000
+
+Set DB_BACKEND=memory to run against the in-process stand-in from memory_db.py,
+which leaves only application overhead in the numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import time
+from datetime import datetime, timedelta
+
+# Never benchmark against the application database
+os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "seubank_bench")
+
+import server  # noqa: E402
+import orjson  # noqa: E402
+from fastapi import Response  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from server import (  # noqa: E402
+    Account, AccountType, BatchTransferRequest, Transaction, TransactionType, TransferRequest, User
+)
+
+db = server.db
+
+
+async def reset_database():
+    for name in await db.list_collection_names():
+        await db.drop_collection(name)
+    server.user_cache.clear()
+
+
+async def timed(fn, repeat: int) -> dict:
+    """Run ``fn`` ``repeat`` times and summarize latencies in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+async def seed_users(count: int, accounts_per_user: int = 2, transactions_per_user: int = 5):
+    users, accounts, transactions = [], [], []
+    for i in range(count):
+        user = User(email=f"bench{i}@seubank.com", full_name=f"Bench User {i}", phone="+55 11 90000-0000")
+        users.append({**user.dict(), "hashed_password": "x"})
+        for _ in range(accounts_per_user):
+            account = Account(user_id=user.id, account_type=AccountType.CHECKING, balance_cents=random.randint(0, 1000000))
+            accounts.append(account.to_document())
+        for _ in range(transactions_per_user):
+            transactions.append(Transaction(
+                to_account_id=accounts[-1]["id"],
+                amount_cents=1000,
+                transaction_type=TransactionType.DEPOSIT,
+                description="bench",
+                user_id=user.id
+            ).to_document())
+    for collection, documents in (("users", users), ("accounts", accounts), ("transactions", transactions)):
+        if documents:
+            await db[collection].insert_many(documents)
+
+
+async def seed_accounts(count: int, batch_size: int = 10000):
+    # One user per two accounts and one transaction per account, inserted in batches
+    for start in range(0, count, batch_size):
+        users, accounts, transactions = [], [], []
+        for i in range(start, min(start + batch_size, count)):
+            if i % 2 == 0:
+                user = User(email=f"bench{i}@seubank.com", full_name=f"Bench User {i}", phone="+55 11 90000-0000")
+                users.append({**user.dict(), "hashed_password": "x"})
+            # Sequential account numbers: random ones collide on the unique index at a million accounts
+            account = Account(
+                user_id=user.id, account_number=f"B{i:07d}", account_type=AccountType.SAVINGS,
+                balance_cents=random.randint(0, 1000000)
+            )
+            accounts.append(account.to_document())
+            transactions.append(Transaction(
+                to_account_id=account.id,
+                amount_cents=1000,
+                transaction_type=TransactionType.DEPOSIT,
+                description="bench",
+                user_id=user.id
+            ).to_document())
+        await db.users.insert_many(users)
+        await db.accounts.insert_many(accounts)
+        await db.transactions.insert_many(transactions)
+
+
+async def legacy_get_all_users():
+    # The previous per-user implementation (2N+1 round trips), kept for comparison
+    users = await db.users.find({}).to_list(1000)
+    for user_data in users:
+        await db.accounts.find({"user_id": user_data["id"]}).to_list(100)
+        await db.transactions.count_documents({"user_id": user_data["id"]})
+
+
+async def bench_admin_users(args):
+    print(f"{'users':>8} {'legacy p50':>12} {'batched p50':>12} {'batched p95':>12}")
+    for count in args.counts:
+        await reset_database()
+        await server.ensure_indexes("ensure")
+        await seed_users(count)
+        legacy = await timed(legacy_get_all_users, args.repeat)
+        batched = await timed(server.list_users_with_accounts, args.repeat)
+        print(f"{count:>8} {legacy['p50_ms']:>10.2f}ms {batched['p50_ms']:>10.2f}ms {batched['p95_ms']:>10.2f}ms")
+
+
+async def legacy_get_admin_stats():
+    # The previous implementation: five sequential counts plus summing balances in Python
+    await db.users.count_documents({})
+    await db.accounts.count_documents({})
+    await db.transactions.count_documents({})
+    await db.users.count_documents({"is_active": True})
+    await db.transactions.count_documents({"timestamp": {"$gte": datetime.utcnow() - timedelta(days=7)}})
+    accounts = await db.accounts.find({}).to_list(1000)
+    sum(account["balance_cents"] for account in accounts)
+
+
+async def bench_admin_stats(args):
+    print(
+        f"{'accounts':>8} {'legacy p50':>12} {'legacy p95':>12} "
+        f"{'aggregated p50':>15} {'aggregated p95':>15}"
+    )
+    for count in args.counts:
+        await reset_database()
+        await server.ensure_indexes("ensure")
+        await seed_accounts(count)
+        legacy = await timed(legacy_get_admin_stats, args.repeat)
+        aggregated = await timed(server.compute_admin_stats, args.repeat)
+        print(
+            f"{count:>8} {legacy['p50_ms']:>10.2f}ms {legacy['p95_ms']:>10.2f}ms "
+            f"{aggregated['p50_ms']:>13.2f}ms {aggregated['p95_ms']:>13.2f}ms"
+        )
+
+
+async def seed_payroll(count: int):
+    payer = User(email="payroll@seubank.com", full_name="Payroll", phone="+55 11 90000-0000")
+    await db.users.insert_one({**payer.dict(), "hashed_password": "x"})
+    source = Account(user_id=payer.id, account_type=AccountType.CHECKING, balance_cents=count * 100000)
+    payees = [Account(user_id=payer.id, account_type=AccountType.CHECKING) for _ in range(count)]
+    await db.accounts.insert_many([source.to_document()] + [payee.to_document() for payee in payees])
+    transfers = [
+        TransferRequest(from_account_id=source.id, to_account_id=payee.id, amount=10.0, description="payroll")
+        for payee in payees
+    ]
+    return payer, transfers
+
+
+async def bench_batch_transfer(args):
+    print(f"{'transfers':>9} {'single/s':>10} {'batch/s':>10} {'speedup':>8}")
+    for count in args.counts:
+        await reset_database()
+        await server.ensure_indexes("ensure")
+        payer, transfers = await seed_payroll(count)
+
+        started = time.perf_counter()
+        for transfer in transfers:
+            await server.transfer_money(transfer, Response(), current_user=payer, idempotency_key=None)
+        single_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for start in range(0, count, server.BATCH_TRANSFER_MAX_ITEMS):
+            chunk = BatchTransferRequest(transfers=transfers[start:start + server.BATCH_TRANSFER_MAX_ITEMS])
+            await server.batch_transfer(chunk, Response(), current_user=payer, idempotency_key=None)
+        batch_seconds = time.perf_counter() - started
+
+        print(
+            f"{count:>9} {count / single_seconds:>10.0f} {count / batch_seconds:>10.0f} "
+            f"{single_seconds / batch_seconds:>7.1f}x"
+        )
+
+
+async def seed_postings(account_id: str, count: int, batch_size: int = 10000):
+    started = datetime.utcnow() - timedelta(seconds=count)
+    for start in range(0, count, batch_size):
+        transactions = [
+            Transaction(
+                to_account_id=account_id,
+                amount_cents=1000 + i % 100,
+                transaction_type=TransactionType.DEPOSIT,
+                description=f"bench deposit {i}",
+                timestamp=started + timedelta(seconds=i),
+                user_id="bench"
+            )
+            for i in range(start, min(start + batch_size, count))
+        ]
+        await server.insert_ledger_entries(transactions)
+
+
+async def bench_statement_export(args):
+    print(f"{'rows':>9} {'format':>7} {'rows/s':>10} {'MB':>8} {'peak RSS +MB':>13}")
+    for count in args.counts:
+        await reset_database()
+        await server.ensure_indexes("ensure")
+        await seed_postings("bench-account", count)
+        for output_format in ("csv", "ndjson"):
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            started = time.perf_counter()
+            size = 0
+            async for chunk in server.stream_statement({"account_id": "bench-account"}, output_format):
+                size += len(chunk)
+            seconds = time.perf_counter() - started
+            # ru_maxrss is the process-wide peak in KiB, so this is the growth caused by the export
+            rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+            print(
+                f"{count:>9} {output_format:>7} {count / seconds:>10.0f} "
+                f"{size / 1e6:>8.1f} {rss_growth / 1024:>13.1f}"
+            )
+
+
+async def bench_serialization(args):
+    # Mirrors what FastAPI does with a response_model: validate, dump in JSON mode, json.dumps
+    adapter = TypeAdapter(list[Transaction])
+
+    def fastapi_serialize(content):
+        return json.dumps(adapter.dump_python(adapter.validate_python(content), mode="json")).encode("utf-8")
+
+    print(f"{'rows':>6} {'models+validate':>16} {'validate':>10} {'orjson':>10}  (us/row)")
+    for count in args.counts:
+        documents = [
+            Transaction(
+                to_account_id="bench-account",
+                amount_cents=1000 + i,
+                transaction_type=TransactionType.DEPOSIT,
+                description=f"bench deposit {i}",
+                user_id="bench"
+            ).to_document()
+            for i in range(count)
+        ]
+        paths = {
+            # Previous path: build models in the handler, then FastAPI re-validates them
+            "models+validate": lambda: fastapi_serialize([Transaction(**document) for document in documents]),
+            # Default path: FastAPI validates the projected documents once
+            "validate": lambda: fastapi_serialize(documents),
+            # FAST_JSON_RESPONSES path
+            "orjson": lambda: orjson.dumps([
+                server.add_computed_fields(dict(document), Transaction) for document in documents
+            ]),
+        }
+        per_row = {}
+        for name, serialize in paths.items():
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                serialize()
+            per_row[name] = (time.perf_counter() - started) / args.repeat / count * 1e6
+        print(f"{count:>6} {per_row['models+validate']:>16.2f} {per_row['validate']:>10.2f} {per_row['orjson']:>10.2f}")
+
+
+BENCHMARKS = {
+    "admin-users": bench_admin_users,
+    "admin-stats": bench_admin_stats,
+    "batch-transfer": bench_batch_transfer,
+    "statement-export": bench_statement_export,
+    "serialization": bench_serialization,
+}
+
+# Benchmarks that never touch MongoDB
+OFFLINE_BENCHMARKS = {"serialization"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SeuBank backend benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            await BENCHMARKS[args.benchmark](args)
+        finally:
+            if args.benchmark not in OFFLINE_BENCHMARKS:
+                await reset_database()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
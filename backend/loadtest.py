@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+SeuBank Load Test
+Drives the API with concurrent virtual users, either in-process or over HTTP, and
+reports throughput and latency percentiles per endpoint.
+
+Usage:
+    python backend/loadtest.py --users 50 --duration 30
+    python backend/loadtest.py --url http://localhost:8001 --mix login=1,accounts=6,deposit=2,transfer=1
+    python backend/loadtest.py --output after.json --compare before.json --max-regression 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+
+DEFAULT_MIX = "login=1,accounts=5,transactions=2,deposit=2,transfer=2"
+PASSWORD = "LoadTest@123"
+SETUP_CONCURRENCY = 8
+OPENING_DEPOSIT = 1000.0
+
+
+class VirtualUser:
+    def __init__(self, email: str):
+        self.email = email
+        self.token = None
+        self.checking_id = None
+        self.savings_id = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, label: str, elapsed_ms: float, ok: bool):
+        self.samples.setdefault(label, []).append(elapsed_ms)
+        self.errors[label] = self.errors.get(label, 0) + (not ok)
+
+    def summary(self, seconds: float) -> dict:
+        endpoints = {label: summarize(samples, self.errors[label], seconds) for label, samples in self.samples.items()}
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        total = summarize(everything, sum(self.errors.values()), seconds) if everything else {}
+        return {"endpoints": endpoints, "total": total}
+
+
+def percentile(samples: list, fraction: float) -> float:
+    # Nearest-rank on an already sorted list
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def summarize(samples: list, errors: int, seconds: float) -> dict:
+    samples = sorted(samples)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / seconds, 2),
+        "p50_ms": round(percentile(samples, 0.50), 2),
+        "p95_ms": round(percentile(samples, 0.95), 2),
+        "p99_ms": round(percentile(samples, 0.99), 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def call(http: httpx.AsyncClient, recorder: Recorder, method: str, path: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await http.request(method, path, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    recorder.record(f"{method} {path}", (time.perf_counter() - started) * 1000, ok)
+
+
+async def op_login(http, recorder, user: VirtualUser):
+    await call(http, recorder, "POST", "/api/auth/login", json={"email": user.email, "password": PASSWORD})
+
+
+async def op_accounts(http, recorder, user: VirtualUser):
+    await call(http, recorder, "GET", "/api/accounts", headers=user.headers)
+
+
+async def op_transactions(http, recorder, user: VirtualUser):
+    await call(http, recorder, "GET", "/api/transactions", headers=user.headers, params={"limit": 20})
+
+
+async def op_deposit(http, recorder, user: VirtualUser):
+    await call(http, recorder, "POST", "/api/transactions/deposit", headers=user.headers, json={
+        "to_account_id": user.checking_id, "amount": 10.0, "transaction_type": "deposit", "description": "load test"
+    })
+
+
+async def op_transfer(http, recorder, user: VirtualUser):
+    await call(http, recorder, "POST", "/api/transactions/transfer", headers=user.headers, json={
+        "from_account_id": user.checking_id, "to_account_id": user.savings_id, "amount": 1.0, "description": "load test"
+    })
+
+
+OPERATIONS = {
+    "login": op_login,
+    "accounts": op_accounts,
+    "transactions": op_transactions,
+    "deposit": op_deposit,
+    "transfer": op_transfer,
+}
+
+
+async def setup_user(http: httpx.AsyncClient, user: VirtualUser):
+    # Register, open a savings account next to the default checking one and fund the checking account
+    response = await http.post("/api/auth/register", json={
+        "email": user.email, "password": PASSWORD, "full_name": "Load Test", "phone": "+55 11 90000-0000"
+    })
+    response.raise_for_status()
+    user.token = response.json()["access_token"]
+    response = await http.get("/api/accounts", headers=user.headers)
+    response.raise_for_status()
+    user.checking_id = response.json()[0]["id"]
+    response = await http.post("/api/accounts", headers=user.headers, json={"account_type": "savings"})
+    response.raise_for_status()
+    user.savings_id = response.json()["id"]
+    response = await http.post("/api/transactions/deposit", headers=user.headers, json={
+        "to_account_id": user.checking_id, "amount": OPENING_DEPOSIT, "transaction_type": "deposit",
+        "description": "load test opening deposit"
+    })
+    response.raise_for_status()
+
+
+async def run_user(http, recorder: Recorder, user: VirtualUser, mix: dict, deadline: float, max_requests: int):
+    names, weights = list(mix), list(mix.values())
+    sent = 0
+    while time.perf_counter() < deadline and (not max_requests or sent < max_requests):
+        await OPERATIONS[random.choices(names, weights)[0]](http, recorder, user)
+        sent += 1
+
+
+async def run_load(http: httpx.AsyncClient, args) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    users = [VirtualUser(f"load-{run_id}-{i}@seubank.com") for i in range(args.users)]
+    semaphore = asyncio.Semaphore(SETUP_CONCURRENCY)
+
+    async def setup(user):
+        async with semaphore:
+            await setup_user(http, user)
+
+    await asyncio.gather(*(setup(user) for user in users))
+
+    recorder = Recorder()
+    started_at = datetime.utcnow().isoformat()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(run_user(http, recorder, user, args.mix, deadline, args.requests) for user in users))
+    seconds = time.perf_counter() - started
+    return {
+        "run": {
+            "started_at": started_at,
+            "target": args.url or "in-process",
+            "users": args.users,
+            "duration_s": round(seconds, 2),
+            "mix": args.mix,
+        },
+        **recorder.summary(seconds),
+    }
+
+
+async def run_in_process(args) -> dict:
+    # Never load test against the application database
+    os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "seubank_bench")
+    import server
+
+    async def reset_database():
+        for name in await server.db.list_collection_names():
+            await server.db.drop_collection(name)
+
+    # ASGITransport does not send lifespan events, so run the startup and shutdown hooks here
+    await reset_database()
+    await server.startup_event()
+    try:
+        # Report unhandled server errors as 500s, the way they look over HTTP
+        transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as http:
+            return await run_load(http, args)
+    finally:
+        await reset_database()
+        await server.shutdown_db_client()
+
+
+async def run_over_http(args) -> dict:
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as http:
+        return await run_load(http, args)
+
+
+def print_report(result: dict):
+    print(f"{'endpoint':<32} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    rows = sorted(result["endpoints"].items()) + [("total", result["total"])]
+    for label, stats in rows:
+        if not stats:
+            continue
+        print(
+            f"{label:<32} {stats['requests']:>9} {stats['errors']:>7} {stats['throughput_rps']:>9.1f} "
+            f"{stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms"
+        )
+
+
+def compare(result: dict, baseline: dict, max_regression: float) -> bool:
+    """Print p95 and throughput changes against a previous run; False if any p95 regressed too far."""
+    print(f"\n{'endpoint':<32} {'p95 before':>11} {'p95 after':>10} {'change':>8} {'req/s change':>13}")
+    ok = True
+    for label, stats in sorted(result["endpoints"].items()):
+        before = baseline["endpoints"].get(label)
+        if not before:
+            continue
+        p95_change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        rps_change = (
+            (stats["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+            if before["throughput_rps"] else 0.0
+        )
+        regressed = p95_change > max_regression
+        ok = ok and not regressed
+        print(
+            f"{label:<32} {before['p95_ms']:>9.1f}ms {stats['p95_ms']:>8.1f}ms {p95_change:>+7.1f}% "
+            f"{rps_change:>+12.1f}%{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SeuBank API load test")
+    parser.add_argument("--url", help="Base URL of a running backend; omit to drive the app in-process")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to generate load for")
+    parser.add_argument("--requests", type=int, default=0, help="Stop each user after this many requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Operation weights ({DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=20, help="Allowed p95 increase in percent")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_over_http(args) if args.url else run_in_process(args))
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(result, handle, indent=2)
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        if not compare(result, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+SeuBank Backend Management Commands
+One-shot maintenance jobs that run against the configured database.
+
+Usage:
+    python backend/manage.py migrate-cents
+    python backend/manage.py backfill-postings --batch-size 1000
+    python backend/manage.py export-transactions --output exports/transactions --from 2024-01-01
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pymongo import ASCENDING, ReadPreference
+
+import server
+
+
+async def migrate_cents(args):
+    report = await server.migrate_money_to_cents()
+    print(json.dumps(report, indent=2, default=str))
+
+
+async def backfill_postings(args):
+    report = await server.backfill_postings(batch_size=args.batch_size)
+    print(json.dumps(report, indent=2))
+
+
+def utc_day(value: str) -> datetime:
+    """Parse an --from/--to bound, which must fall on a UTC day boundary.
+
+    Each run rewrites whole date=YYYY-MM-DD partitions, so a bound inside a day
+    would replace that day's partition with only part of its rows.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO date {value!r}")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    if moment.time() != datetime.min.time():
+        raise argparse.ArgumentTypeError(f"{value!r} is not midnight UTC; partitions are exported whole days at a time")
+    return moment
+
+
+TRANSACTION_COLUMNS = (
+    "id", "user_id", "from_account_id", "to_account_id",
+    "transaction_type", "description", "amount_cents", "timestamp",
+)
+
+
+async def export_transactions(args):
+    """Export db.transactions to Parquet files partitioned by UTC day (date=YYYY-MM-DD).
+
+    Reads from a secondary when one is available, walks the timestamp index in
+    order so only one partition writer is open at a time, and never holds more
+    than one row group in memory. Re-exporting a day overwrites its partition,
+    which is why --from/--to only accept UTC day boundaries.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("pyarrow is required for Parquet export (pip install pyarrow)")
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("user_id", pa.string()),
+        ("from_account_id", pa.string()),
+        ("to_account_id", pa.string()),
+        ("transaction_type", pa.string()),
+        ("description", pa.string()),
+        ("amount_cents", pa.int64()),
+        ("timestamp", pa.timestamp("ms")),
+    ])
+    query = {}
+    if args.from_ or args.to:
+        query["timestamp"] = {}
+        if args.from_:
+            query["timestamp"]["$gte"] = args.from_
+        if args.to:
+            query["timestamp"]["$lt"] = args.to
+
+    output = Path(args.output)
+    columns = {name: [] for name in TRANSACTION_COLUMNS}
+    writer, partition = None, None
+    report = {"rows": 0, "partitions": 0, "row_groups": 0}
+
+    def flush():
+        if columns["id"]:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema), row_group_size=args.row_group_size)
+            report["row_groups"] += 1
+            for values in columns.values():
+                values.clear()
+
+    started = time.perf_counter()
+    collection = server.db.transactions.with_options(read_preference=ReadPreference.SECONDARY_PREFERRED)
+    cursor = collection.find(query, {"_id": 0}).sort([("timestamp", ASCENDING), ("id", ASCENDING)])
+    async for transaction in cursor.batch_size(args.batch_size):
+        day = transaction["timestamp"].strftime("%Y-%m-%d")
+        if day != partition:
+            if writer:
+                flush()
+                writer.close()
+            partition = day
+            path = output / f"date={day}" / "transactions.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(path, schema)
+            report["partitions"] += 1
+        for name in TRANSACTION_COLUMNS:
+            columns[name].append(transaction.get(name))
+        report["rows"] += 1
+        if len(columns["id"]) >= args.row_group_size:
+            flush()
+    if writer:
+        flush()
+        writer.close()
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    print(json.dumps(report, indent=2))
+
+
+COMMANDS = {
+    "migrate-cents": migrate_cents,
+    "backfill-postings": backfill_postings,
+    "export-transactions": export_transactions,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SeuBank backend management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("migrate-cents", help="convert float balances and amounts to integer cents")
+    backfill = subparsers.add_parser("backfill-postings", help="create ledger postings for existing transactions")
+    backfill.add_argument("--batch-size", type=int, default=1000)
+    export = subparsers.add_parser("export-transactions", help="export transactions to partitioned Parquet files")
+    export.add_argument("--output", required=True, help="directory that receives date=YYYY-MM-DD partitions")
+    export.add_argument("--from", dest="from_", type=utc_day, help="inclusive start day (YYYY-MM-DD, UTC)")
+    export.add_argument("--to", type=utc_day, help="exclusive end day (YYYY-MM-DD, UTC)")
+    export.add_argument("--batch-size", type=int, default=5000, help="documents per cursor batch")
+    export.add_argument("--row-group-size", type=int, default=100000, help="rows per Parquet row group")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            await COMMANDS[args.command](args)
+        finally:
+            server.client.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
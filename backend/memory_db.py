@@ -0,0 +1,746 @@
+"""
+In-memory stand-in for the Motor client used by server.py.
+
+Implements the subset of the async collection API the backend relies on, so the
+application can run without a MongoDB server (DB_BACKEND=memory) and benchmarks
+can measure application overhead separately from database latency.
+
+Every operation completes without yielding to the event loop, so single-document
+updates are as atomic as they are in MongoDB. Stored values and query values are
+normalized like a BSON round trip, so aware datetimes compare as naive UTC.
+Not supported: sessions and transactions, TTL expiry, $lookup and other pipeline
+stages the app never sends.
+"""
+
+import copy
+import functools
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+MISSING = object()
+
+
+def get_path(document: dict, path: str):
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return MISSING
+        value = value[part]
+    return value
+
+
+def set_path(document: dict, path: str, value):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[leaf] = value
+
+
+def unset_path(document: dict, path: str):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(leaf, None)
+
+
+def bson_value(value):
+    """Copy ``value`` the way a BSON round trip returns it: aware datetimes become naive UTC."""
+    if isinstance(value, dict):
+        return {key: bson_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [bson_value(item) for item in value]
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    # Remaining scalars are immutable
+    return value
+
+
+def clone(document: dict) -> dict:
+    return bson_value(document)
+
+
+def hashable(value):
+    if isinstance(value, dict):
+        return tuple((key, hashable(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(hashable(item) for item in value)
+    return value
+
+
+# Query matching
+
+def compare(left, right, op) -> bool:
+    if left is MISSING or left is None or right is None:
+        return False
+    try:
+        return op(left, bson_value(right))
+    except TypeError:
+        return False
+
+
+def equals(value, expected) -> bool:
+    if value is MISSING:
+        return expected is None
+    expected = bson_value(expected)
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+FIELD_OPERATORS = {
+    "$eq": equals,
+    "$ne": lambda value, expected: not equals(value, expected),
+    "$gt": lambda value, expected: compare(value, expected, lambda a, b: a > b),
+    "$gte": lambda value, expected: compare(value, expected, lambda a, b: a >= b),
+    "$lt": lambda value, expected: compare(value, expected, lambda a, b: a < b),
+    "$lte": lambda value, expected: compare(value, expected, lambda a, b: a <= b),
+    "$in": lambda value, expected: any(equals(value, item) for item in expected),
+    "$nin": lambda value, expected: not any(equals(value, item) for item in expected),
+    "$exists": lambda value, expected: (value is not MISSING) == bool(expected),
+}
+
+
+def is_operator_document(value) -> bool:
+    return isinstance(value, dict) and bool(value) and all(key.startswith("$") for key in value)
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, clause) for clause in condition):
+                return False
+        elif key.startswith("$"):
+            raise OperationFailure(f"unknown top level operator: {key}")
+        else:
+            value = get_path(document, key)
+            if is_operator_document(condition):
+                for op, expected in condition.items():
+                    if op not in FIELD_OPERATORS:
+                        raise OperationFailure(f"unknown operator: {op}")
+                    if not FIELD_OPERATORS[op](value, expected):
+                        return False
+            elif not equals(value, condition):
+                return False
+    return True
+
+
+def project(document: dict, projection) -> dict:
+    if not projection:
+        return clone(document)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if any(fields.values()):
+        result = {"_id": document["_id"]} if include_id and "_id" in document else {}
+        for field in fields:
+            value = get_path(document, field)
+            if value is not MISSING:
+                set_path(result, field, copy.deepcopy(value))
+        return result
+    result = clone(document)
+    for field in fields:
+        unset_path(result, field)
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def sort_key(value):
+    # MongoDB orders missing and null before every other value
+    return (0, 0) if value is MISSING or value is None else (1, value)
+
+
+def sort_documents(documents: list, spec) -> list:
+    if isinstance(spec, str):
+        spec = [(spec, 1)]
+    elif isinstance(spec, dict):
+        spec = list(spec.items())
+    for field, direction in reversed(list(spec)):
+        documents.sort(key=lambda document: sort_key(get_path(document, field)), reverse=direction < 0)
+    return documents
+
+
+# Aggregation expressions
+
+def evaluate(expression, document: dict):
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = get_path(document, expression[1:])
+        return None if value is MISSING else value
+    if isinstance(expression, list):
+        return [evaluate(item, document) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if not is_operator_document(expression):
+        return {key: evaluate(value, document) for key, value in expression.items()}
+    (op, args), = expression.items()
+    if op == "$literal":
+        return args
+    if op not in EXPRESSION_OPERATORS:
+        raise OperationFailure(f"Unrecognized expression '{op}'")
+    return EXPRESSION_OPERATORS[op](args, document)
+
+
+def expression_cond(args, document):
+    if isinstance(args, dict):
+        args = [args["if"], args["then"], args["else"]]
+    condition, then, otherwise = args
+    return evaluate(then if evaluate(condition, document) else otherwise, document)
+
+
+def expression_if_null(args, document):
+    for arg in args:
+        value = evaluate(arg, document)
+        if value is not None:
+            return value
+    return None
+
+
+def expression_round(args, document):
+    value, places = (evaluate(arg, document) for arg in (args if isinstance(args, list) else [args, 0]))
+    return None if value is None else round(value, places)
+
+
+def expression_date_to_string(args, document):
+    date = evaluate(args["date"], document)
+    if not isinstance(date, datetime):
+        return None
+    return date.strftime(args.get("format", "%Y-%m-%dT%H:%M:%S.%LZ").replace("%L", f"{date.microsecond // 1000:03d}"))
+
+
+def numbers(args, document) -> list:
+    values = [evaluate(arg, document) for arg in (args if isinstance(args, list) else [args])]
+    flattened = [item for value in values for item in (value if isinstance(value, list) else [value])]
+    return [value for value in flattened if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+
+EXPRESSION_OPERATORS = {
+    "$cond": expression_cond,
+    "$ifNull": expression_if_null,
+    "$eq": lambda args, document: evaluate(args[0], document) == evaluate(args[1], document),
+    "$ne": lambda args, document: evaluate(args[0], document) != evaluate(args[1], document),
+    "$gt": lambda args, document: compare(evaluate(args[0], document), evaluate(args[1], document), lambda a, b: a > b),
+    "$gte": lambda args, document: compare(evaluate(args[0], document), evaluate(args[1], document), lambda a, b: a >= b),
+    "$lt": lambda args, document: compare(evaluate(args[0], document), evaluate(args[1], document), lambda a, b: a < b),
+    "$lte": lambda args, document: compare(evaluate(args[0], document), evaluate(args[1], document), lambda a, b: a <= b),
+    "$sum": lambda args, document: sum(numbers(args, document)),
+    "$add": lambda args, document: sum(numbers(args, document)),
+    "$multiply": lambda args, document: functools.reduce(lambda a, b: a * b, numbers(args, document), 1),
+    "$round": expression_round,
+    "$toLong": lambda args, document: None if evaluate(args, document) is None else int(evaluate(args, document)),
+    "$dateToString": expression_date_to_string,
+}
+
+
+class Accumulator:
+    def __init__(self, op: str, expression):
+        if op not in ("$sum", "$avg", "$min", "$max", "$first", "$last", "$push"):
+            raise OperationFailure(f"unknown group operator '{op}'")
+        self.op = op
+        self.expression = expression
+        self.values = []
+
+    def add(self, document: dict):
+        self.values.append(evaluate(self.expression, document))
+
+    def result(self):
+        present = [value for value in self.values if value is not None]
+        numeric = [value for value in present if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if self.op == "$sum":
+            return sum(numeric)
+        if self.op == "$avg":
+            return sum(numeric) / len(numeric) if numeric else None
+        if self.op == "$min":
+            return min(present, default=None)
+        if self.op == "$max":
+            return max(present, default=None)
+        if self.op == "$first":
+            return self.values[0] if self.values else None
+        if self.op == "$last":
+            return self.values[-1] if self.values else None
+        return self.values
+
+
+def stage_group(documents: list, spec: dict) -> list:
+    groups = {}
+    for document in documents:
+        group_id = evaluate(spec["_id"], document)
+        key = hashable(group_id)
+        if key not in groups:
+            groups[key] = (group_id, {
+                field: Accumulator(*next(iter(accumulator.items())))
+                for field, accumulator in spec.items() if field != "_id"
+            })
+        for accumulator in groups[key][1].values():
+            accumulator.add(document)
+    return [
+        {"_id": group_id, **{field: accumulator.result() for field, accumulator in accumulators.items()}}
+        for group_id, accumulators in groups.values()
+    ]
+
+
+def stage_project(documents: list, spec: dict) -> list:
+    if all(value in (0, 1, True, False) for value in spec.values()):
+        return [project(document, spec) for document in documents]
+    result = []
+    for document in documents:
+        projected = {"_id": document.get("_id")} if spec.get("_id", 1) else {}
+        for field, value in spec.items():
+            if field == "_id":
+                continue
+            projected[field] = get_path(document, field) if value in (1, True) else evaluate(value, document)
+        result.append(projected)
+    return result
+
+
+PIPELINE_STAGES = {
+    "$match": lambda documents, spec: [document for document in documents if matches(document, spec)],
+    "$group": stage_group,
+    "$sort": lambda documents, spec: sort_documents(documents, spec),
+    "$skip": lambda documents, spec: documents[spec:],
+    "$limit": lambda documents, spec: documents[:spec],
+    "$project": stage_project,
+    "$count": lambda documents, spec: [{spec: len(documents)}] if documents else [],
+}
+
+
+def run_pipeline(documents: list, pipeline: list) -> list:
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name not in PIPELINE_STAGES:
+            raise OperationFailure(f"Unrecognized pipeline stage name: '{name}'")
+        documents = PIPELINE_STAGES[name](documents, spec)
+    return documents
+
+
+# Updates
+
+def apply_update(document: dict, update, inserting: bool) -> dict:
+    """Return the updated copy of ``document``; ``update`` is an operator document or a pipeline."""
+    updated = clone(document)
+    if isinstance(update, list):
+        for stage in update:
+            (name, spec), = stage.items()
+            if name in ("$set", "$addFields"):
+                values = {field: bson_value(evaluate(value, updated)) for field, value in spec.items()}
+                for field, value in values.items():
+                    set_path(updated, field, value)
+            elif name == "$unset":
+                for field in [spec] if isinstance(spec, str) else spec:
+                    unset_path(updated, field)
+            else:
+                raise OperationFailure(f"Unsupported update pipeline stage: '{name}'")
+        return updated
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for field, value in fields.items():
+            if op in ("$set", "$setOnInsert"):
+                set_path(updated, field, bson_value(value))
+            elif op == "$inc":
+                current = get_path(updated, field)
+                set_path(updated, field, (0 if current is MISSING else current) + value)
+            elif op == "$unset":
+                unset_path(updated, field)
+            else:
+                raise OperationFailure(f"Unknown modifier: {op}")
+    return updated
+
+
+def upsert_seed(query: dict) -> dict:
+    # Equality conditions in the filter become fields of the inserted document
+    seed = {}
+    for key, condition in query.items():
+        if key == "$and":
+            for clause in condition:
+                seed.update(upsert_seed(clause))
+        elif not key.startswith("$"):
+            if is_operator_document(condition):
+                if "$eq" in condition:
+                    set_path(seed, key, bson_value(condition["$eq"]))
+            else:
+                set_path(seed, key, bson_value(condition))
+    return seed
+
+
+class MemoryCursor:
+    """Lazy result of ``find``: chain sort/skip/limit, then ``to_list`` or ``async for``."""
+
+    def __init__(self, collection: "MemoryCollection", query: dict, projection=None):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = [(key_or_list, direction or 1)] if isinstance(key_or_list, str) else key_or_list
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int):
+        return self
+
+    def _evaluate(self) -> list:
+        if self._results is None:
+            documents = self.collection._find(self.query)
+            if self._sort:
+                documents = sort_documents(documents, self._sort)
+            documents = documents[self._skip:]
+            if self._limit:
+                documents = documents[:self._limit]
+            self._results = [project(document, self.projection) for document in documents]
+        return self._results
+
+    async def to_list(self, length=None):
+        results = self._evaluate()
+        return results[:length] if length else list(results)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self._evaluate():
+            yield document
+
+
+class MemoryAggregationCursor:
+    def __init__(self, documents: list):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents[:length] if length else list(self.documents)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._documents = {}
+        # index name -> {"key": [(field, direction)], "unique": bool, **options}
+        self._indexes = {"_id_": {"key": [("_id", 1)], "unique": True}}
+        # unique index name -> {value tuple: _id}
+        self._unique = {"_id_": {}}
+
+    def with_options(self, **kwargs):
+        # Read preferences and write concerns have no meaning for a single in-process copy
+        return self
+
+    # Index bookkeeping
+
+    def _index_value(self, index_name: str, document: dict):
+        return tuple(
+            hashable(None if value is MISSING else value)
+            for value in (get_path(document, field) for field, _ in self._indexes[index_name]["key"])
+        )
+
+    def _check_unique(self, document: dict, replacing=None):
+        for name, values in self._unique.items():
+            owner = values.get(self._index_value(name, document))
+            if owner is not None and owner != replacing:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.database.name}.{self.name} index: {name}", 11000
+                )
+
+    def _index(self, document: dict):
+        for name, values in self._unique.items():
+            values[self._index_value(name, document)] = document["_id"]
+
+    def _unindex(self, document: dict):
+        for name, values in self._unique.items():
+            values.pop(self._index_value(name, document), None)
+
+    def _candidates(self, query: dict) -> list:
+        # Equality on a single-field unique index is answered from the index
+        for name, values in self._unique.items():
+            (field, _), *rest = self._indexes[name]["key"]
+            condition = query.get(field, MISSING)
+            if rest or condition is MISSING or isinstance(condition, (dict, list)):
+                continue
+            document_id = values.get((hashable(bson_value(condition)),))
+            return [self._documents[document_id]] if document_id in self._documents else []
+        return list(self._documents.values())
+
+    def _find(self, query: dict) -> list:
+        return [document for document in self._candidates(query or {}) if matches(document, query or {})]
+
+    def _insert(self, document: dict):
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        stored = clone(document)
+        self._check_unique(stored)
+        self._documents[stored["_id"]] = stored
+        self._index(stored)
+        self.database._created.add(self.name)
+
+    def _replace(self, current: dict, updated: dict):
+        if updated.get("_id", current["_id"]) != current["_id"]:
+            raise OperationFailure("Performing an update on the path '_id' would modify the immutable field '_id'")
+        updated["_id"] = current["_id"]
+        self._check_unique(updated, replacing=current["_id"])
+        self._unindex(current)
+        self._documents[current["_id"]] = updated
+        self._index(updated)
+
+    def _update(self, query: dict, update, upsert: bool, multi: bool) -> dict:
+        targets = self._find(query)
+        if not multi:
+            targets = targets[:1]
+        if not targets and upsert:
+            document = apply_update(upsert_seed(query), update, inserting=True)
+            self._insert(document)
+            return {"n": 1, "nModified": 0, "upserted": document["_id"]}
+        modified = 0
+        for current in targets:
+            updated = apply_update(current, update, inserting=False)
+            if updated != current:
+                self._replace(current, updated)
+                modified += 1
+        return {"n": len(targets), "nModified": modified}
+
+    def _delete(self, query: dict, multi: bool) -> int:
+        targets = self._find(query)
+        if not multi:
+            targets = targets[:1]
+        for document in targets:
+            self._unindex(document)
+            del self._documents[document["_id"]]
+        return len(targets)
+
+    # Public API, mirroring AsyncIOMotorCollection
+
+    def find(self, filter=None, projection=None, session=None, **kwargs):
+        cursor = MemoryCursor(self, filter, projection)
+        if kwargs.get("sort"):
+            cursor.sort(kwargs["sort"])
+        cursor.skip(kwargs.get("skip", 0)).limit(kwargs.get("limit", 0))
+        return cursor
+
+    async def find_one(self, filter=None, projection=None, session=None, **kwargs):
+        results = await self.find(filter, projection, **kwargs).limit(1).to_list(1)
+        return results[0] if results else None
+
+    async def insert_one(self, document: dict, session=None, **kwargs) -> InsertOneResult:
+        self._insert(document)
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents, ordered: bool = True, session=None, **kwargs) -> InsertManyResult:
+        inserted, errors = [], []
+        for position, document in enumerate(documents):
+            try:
+                self._insert(document)
+                inserted.append(document["_id"])
+            except DuplicateKeyError as exc:
+                errors.append({"index": position, "code": exc.code, "errmsg": str(exc), "op": document})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted), "writeConcernErrors": []})
+        return InsertManyResult(inserted, True)
+
+    async def update_one(self, filter: dict, update, upsert: bool = False, session=None, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, multi=False), True)
+
+    async def update_many(self, filter: dict, update, upsert: bool = False, session=None, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, multi=True), True)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False, session=None, **kwargs):
+        targets = self._find(filter)[:1]
+        if targets:
+            current = targets[0]
+            updated = clone(replacement)
+            self._replace(current, updated)
+            return UpdateResult({"n": 1, "nModified": int(updated != current)}, True)
+        if not upsert:
+            return UpdateResult({"n": 0, "nModified": 0}, True)
+        document = {**upsert_seed(filter), **clone(replacement)}
+        self._insert(document)
+        return UpdateResult({"n": 1, "nModified": 0, "upserted": document["_id"]}, True)
+
+    async def find_one_and_update(self, filter: dict, update, projection=None, sort=None, upsert: bool = False,
+                                  return_document=ReturnDocument.BEFORE, session=None, **kwargs):
+        targets = self._find(filter)
+        if sort:
+            targets = sort_documents(targets, sort)
+        if not targets:
+            if not upsert:
+                return None
+            document = apply_update(upsert_seed(filter), update, inserting=True)
+            self._insert(document)
+            return project(document, projection) if return_document == ReturnDocument.AFTER else None
+        current = targets[0]
+        updated = apply_update(current, update, inserting=False)
+        self._replace(current, updated)
+        return project(updated if return_document == ReturnDocument.AFTER else current, projection)
+
+    async def delete_one(self, filter: dict, session=None, **kwargs) -> DeleteResult:
+        return DeleteResult({"n": self._delete(filter, multi=False)}, True)
+
+    async def delete_many(self, filter: dict, session=None, **kwargs) -> DeleteResult:
+        return DeleteResult({"n": self._delete(filter, multi=True)}, True)
+
+    async def count_documents(self, filter: dict, session=None, **kwargs) -> int:
+        documents = self._find(filter)[kwargs.get("skip", 0):]
+        return len(documents[:kwargs["limit"]] if kwargs.get("limit") else documents)
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return len(self._documents)
+
+    async def distinct(self, key: str, filter=None, session=None, **kwargs) -> list:
+        values = []
+        for document in self._find(filter):
+            value = get_path(document, key)
+            for item in value if isinstance(value, list) else [value]:
+                if item is not MISSING and item not in values:
+                    values.append(item)
+        return values
+
+    def aggregate(self, pipeline: list, session=None, **kwargs) -> MemoryAggregationCursor:
+        # A leading $match goes through _find so it can use the unique indexes
+        query = pipeline[0]["$match"] if pipeline and "$match" in pipeline[0] else {}
+        documents = run_pipeline(self._find(query), pipeline[1:] if query else pipeline)
+        return MemoryAggregationCursor([clone(document) for document in documents])
+
+    async def bulk_write(self, requests: list, ordered: bool = True, session=None, **kwargs) -> BulkWriteResult:
+        result = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []}
+        for position, request in enumerate(requests):
+            if isinstance(request, InsertOne):
+                self._insert(request._doc)
+                result["nInserted"] += 1
+                continue
+            if isinstance(request, (DeleteOne, DeleteMany)):
+                result["nRemoved"] += self._delete(request._filter, multi=isinstance(request, DeleteMany))
+                continue
+            if isinstance(request, ReplaceOne):
+                outcome = (await self.replace_one(request._filter, request._doc, upsert=request._upsert)).raw_result
+            elif isinstance(request, (UpdateOne, UpdateMany)):
+                outcome = self._update(
+                    request._filter, request._doc, request._upsert, multi=isinstance(request, UpdateMany)
+                )
+            else:
+                raise TypeError(f"{request!r} is not a valid request")
+            if "upserted" in outcome:
+                result["nUpserted"] += 1
+                result["upserted"].append({"index": position, "_id": outcome["upserted"]})
+            else:
+                result["nMatched"] += outcome["n"]
+                result["nModified"] += outcome["nModified"]
+        return BulkWriteResult(result, True)
+
+    async def create_indexes(self, indexes: list, session=None, **kwargs) -> list:
+        names = []
+        for index in indexes:
+            document = dict(index.document)
+            name = document.pop("name")
+            document["key"] = list(document["key"].items())
+            self._indexes[name] = document
+            if document.get("unique"):
+                values = {}
+                for stored in self._documents.values():
+                    value = self._index_value(name, stored)
+                    if value in values:
+                        del self._indexes[name]
+                        raise DuplicateKeyError(f"E11000 duplicate key error building index {name}", 11000)
+                    values[value] = stored["_id"]
+                self._unique[name] = values
+            names.append(name)
+        self.database._created.add(self.name)
+        return names
+
+    async def index_information(self, session=None) -> dict:
+        return {name: copy.deepcopy(info) for name, info in self._indexes.items()}
+
+    async def drop(self, session=None):
+        await self.database.drop_collection(self.name)
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections = {}
+        self._created = set()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs) -> MemoryCollection:
+        return self[name]
+
+    async def list_collection_names(self, session=None, **kwargs) -> list:
+        return sorted(self._created)
+
+    async def drop_collection(self, name, session=None):
+        name = getattr(name, "name", name)
+        self._collections.pop(name, None)
+        self._created.discard(name)
+
+    async def command(self, command, value=1, session=None, **kwargs) -> dict:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name in ("hello", "isMaster", "ismaster"):
+            # A standalone server: no setName, so the app runs without transactions
+            return {"isWritablePrimary": True, "ismaster": True, "maxWireVersion": 17, "ok": 1.0}
+        if name == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"no such command: '{name}'")
+
+
+class MemoryClient:
+    """Drop-in for AsyncIOMotorClient backed by Python dictionaries."""
+
+    def __init__(self, *args, **kwargs):
+        self._databases = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self, name)
+        return self._databases[name]
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_database(self, name: str, **kwargs) -> MemoryDatabase:
+        return self[name]
+
+    async def start_session(self, **kwargs):
+        raise OperationFailure("Transactions are not supported by the in-memory backend")
+
+    def close(self):
+        pass
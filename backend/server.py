@@ -1,26 +1,385 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Match
 from motor.motor_asyncio import AsyncIOMotorClient
+from memory_db import MemoryClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import DuplicateKeyError, PyMongoError, WaitQueueTimeoutError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, computed_field
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
+import contextlib
+import contextvars
+import csv
+import io
+import functools
+import hashlib
+import json
+import math
+import random
+import threading
+import time
 import uuid
+import weakref
 from datetime import datetime, timedelta
 import bcrypt
 import jwt
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 import enum
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+LATENCY_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Metric:
+    """Minimal thread-safe Prometheus counter, gauge or histogram with labels.
+
+    Mongo command events arrive on driver threads, so updates take a lock.
+    """
+
+    def __init__(self, name: str, documentation: str, metric_type: str, labelnames=(), buckets=LATENCY_BUCKETS_SECONDS):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set(self, labels: tuple, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def _labels(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{value}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = [
+                (labels, {**value, "buckets": list(value["buckets"])} if isinstance(value, dict) else value)
+                for labels, value in self._values.items()
+            ]
+        for labels, value in items:
+            if self.metric_type != "histogram":
+                lines.append(f"{self.name}{self._labels(labels)} {value}")
+                continue
+            for bound, count in zip(self.buckets, value["buckets"]):
+                bucket_labels = self._labels(labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            inf_labels = self._labels(labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {value['count']}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {value['sum']}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {value['count']}")
+        return lines
+
+METRICS = []
+
+http_requests_total = Metric(
+    "seubank_http_requests_total", "HTTP requests by route template and status.", "counter",
+    ("method", "route", "status")
+)
+http_request_duration = Metric(
+    "seubank_http_request_duration_seconds", "HTTP request latency by route template.", "histogram",
+    ("method", "route")
+)
+http_requests_in_flight = Metric(
+    "seubank_http_requests_in_flight", "HTTP requests currently being served.", "gauge",
+    ("method", "route")
+)
+mongo_command_duration = Metric(
+    "seubank_mongo_command_duration_seconds", "MongoDB command latency by collection and command.", "histogram",
+    ("collection", "command")
+)
+mongo_command_failures = Metric(
+    "seubank_mongo_command_failures_total", "Failed MongoDB commands by collection and command.", "counter",
+    ("collection", "command")
+)
+mongo_pool_checkout_wait = Metric(
+    "seubank_mongo_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool.",
+    "histogram", ("address", "result")
+)
+mongo_pool_connections = Metric(
+    "seubank_mongo_pool_connections", "Open pooled MongoDB connections.", "gauge", ("address",)
+)
+mongo_pool_checked_out = Metric(
+    "seubank_mongo_pool_checked_out_connections", "Pooled MongoDB connections currently in use.", "gauge",
+    ("address",)
+)
+
+# MongoDB command monitoring
+MONGO_SLOW_QUERY_MS = float(os.environ.get("MONGO_SLOW_QUERY_MS", "100"))
+MONGO_QUERY_SHAPES_MAX = int(os.environ.get("MONGO_QUERY_SHAPES_MAX", "1000"))
+
+# Command fields that make up a query shape; sort directions and distinct keys are kept verbatim
+SHAPE_FIELDS = {
+    "find": ("filter", "sort"),
+    "aggregate": ("pipeline",),
+    "findAndModify": ("query", "sort", "update"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+}
+VERBATIM_SHAPE_FIELDS = ("sort", "key")
+
+# Route template of the request being served, set by the metrics middleware
+current_route = contextvars.ContextVar("current_route", default="-")
+
+def query_shape(value):
+    """Replace literals with "?" while keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not any(isinstance(item, dict) for item in value):
+            return "?"
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+def command_fingerprint(command_name: str, command: dict) -> str:
+    parts = {}
+    for field in SHAPE_FIELDS.get(command_name, ()):
+        if field in command:
+            parts[field] = command[field] if field in VERBATIM_SHAPE_FIELDS else query_shape(command[field])
+    return json.dumps(parts, default=str)
+
+class MongoCommandMonitor(monitoring.CommandListener):
+    """Records per-collection command latency and aggregates time per query shape.
+
+    Commands slower than MONGO_SLOW_QUERY_MS are logged with their shape and the
+    route that issued them. Callbacks run on driver threads, hence the lock.
+    """
+
+    def __init__(self, max_shapes: int):
+        self.max_shapes = max_shapes
+        self._pending = {}
+        self._shapes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        fingerprint = command_fingerprint(event.command_name, event.command)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                collection, event.command_name, fingerprint, current_route.get()
+            )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        collection, command_name, fingerprint, route = pending
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe((collection, command_name), seconds)
+        if failed:
+            mongo_command_failures.inc((collection, command_name))
+        self._record_shape(collection, command_name, fingerprint, route, seconds * 1000)
+
+    def _record_shape(self, collection: str, command_name: str, fingerprint: str, route: str, elapsed_ms: float):
+        key = (collection, command_name, fingerprint)
+        with self._lock:
+            stats = self._shapes.pop(key, None) or {
+                "collection": collection,
+                "command": command_name,
+                "shape": fingerprint,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "slow_count": 0,
+                "routes": {},
+            }
+            self._shapes[key] = stats
+            while len(self._shapes) > self.max_shapes:
+                self._shapes.popitem(last=False)
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["routes"][route] = stats["routes"].get(route, 0) + 1
+            if elapsed_ms >= MONGO_SLOW_QUERY_MS:
+                stats["slow_count"] += 1
+        if elapsed_ms >= MONGO_SLOW_QUERY_MS:
+            logger.warning(
+                "Slow MongoDB %s on %s: %.1fms from %s, shape %s",
+                command_name, collection, elapsed_ms, route, fingerprint
+            )
+
+    def report(self, limit: int = 20, sort_by: str = "total_ms") -> List[dict]:
+        with self._lock:
+            shapes = [{**stats, "routes": dict(stats["routes"])} for stats in self._shapes.values()]
+        shapes.sort(key=lambda stats: stats[sort_by], reverse=True)
+        for stats in shapes[:limit]:
+            stats["avg_ms"] = round(stats["total_ms"] / stats["count"], 3)
+            stats["total_ms"] = round(stats["total_ms"], 3)
+            stats["max_ms"] = round(stats["max_ms"], 3)
+        return shapes[:limit]
+
+mongo_command_monitor = MongoCommandMonitor(MONGO_QUERY_SHAPES_MAX)
+
+class MongoPoolMonitor(monitoring.ConnectionPoolListener):
+    """Measures how long requests wait for a pooled connection.
+
+    Check-out start and finish are reported on the same driver thread, so the
+    start time is kept in a thread-local.
+    """
+
+    CHECKOUT_FAILURES = {
+        monitoring.ConnectionCheckOutFailedReason.TIMEOUT: "timeout",
+        monitoring.ConnectionCheckOutFailedReason.POOL_CLOSED: "pool_closed",
+        monitoring.ConnectionCheckOutFailedReason.CONN_ERROR: "connection_error",
+    }
+
+    def __init__(self):
+        self._local = threading.local()
+        self.timeouts = 0
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def _observe_wait(self, event, result: str):
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        if started is not None:
+            mongo_pool_checkout_wait.observe((self._address(event), result), time.perf_counter() - started)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self._observe_wait(event, "ok")
+        mongo_pool_checked_out.inc((self._address(event),))
+
+    def connection_check_out_failed(self, event):
+        result = self.CHECKOUT_FAILURES.get(event.reason, "error")
+        if result == "timeout":
+            self.timeouts += 1
+        self._observe_wait(event, result)
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.inc((self._address(event),), -1)
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc((self._address(event),))
+
+    def connection_closed(self, event):
+        mongo_pool_connections.inc((self._address(event),), -1)
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "connections": {address: value for (address,), value in mongo_pool_connections.snapshot().items()},
+            "checked_out": {address: value for (address,), value in mongo_pool_checked_out.snapshot().items()},
+            "checkout_timeouts": self.timeouts,
+        }
+
+mongo_pool_monitor = MongoPoolMonitor()
+
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+def env_timeout_ms(name: str, default: str) -> Optional[int]:
+    # 0 means "no limit", which the driver spells as None
+    return int(os.environ.get(name, default)) or None
+
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = env_timeout_ms("MONGO_MAX_IDLE_TIME_MS", "0")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = env_timeout_ms("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = env_timeout_ms("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")
+MONGO_CONNECT_TIMEOUT_MS = env_timeout_ms("MONGO_CONNECT_TIMEOUT_MS", "10000")
+MONGO_SOCKET_TIMEOUT_MS = env_timeout_ms("MONGO_SOCKET_TIMEOUT_MS", "0")
+
+# "memory" swaps MongoDB for the in-process stand-in in memory_db.py; every
+# handler and helper goes through the module-level ``db`` below
+DB_BACKEND = os.environ.get("DB_BACKEND", "mongo")
+
+def create_client():
+    if DB_BACKEND == "memory":
+        return MemoryClient()
+    if DB_BACKEND != "mongo":
+        raise RuntimeError(f"Unknown DB_BACKEND {DB_BACKEND!r}, expected 'mongo' or 'memory'")
+    return AsyncIOMotorClient(
+        os.environ['MONGO_URL'],
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=[mongo_command_monitor, mongo_pool_monitor],
+    )
+
+client = create_client()
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -37,6 +396,178 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Security
 security = HTTPBearer()
 
+# Password hashing pool
+PASSWORD_POOL_WORKERS = int(os.environ.get("PASSWORD_POOL_WORKERS", "4"))
+PASSWORD_POOL_MAX_QUEUE = int(os.environ.get("PASSWORD_POOL_MAX_QUEUE", "64"))
+
+class PasswordPool:
+    """Bounded worker pool for bcrypt work, keeping it off the event loop.
+
+    bcrypt releases the GIL, so threads give real parallelism here. Once
+    ``max_workers + max_queue`` jobs are pending, new jobs fail fast with 503.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.run_time_total = 0.0
+        self.run_time_max = 0.0
+
+    async def run(self, fn, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+        submitted = time.perf_counter()
+        timings = {}
+
+        def job():
+            timings["started"] = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings["finished"] = time.perf_counter()
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            self._pending -= 1
+            if "finished" in timings:
+                wait_time = timings["started"] - submitted
+                run_time = timings["finished"] - timings["started"]
+                self.completed += 1
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+                self.run_time_total += run_time
+                self.run_time_max = max(self.run_time_max, run_time)
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_time_avg_ms": round(self.wait_time_total / completed * 1000, 3),
+            "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            "run_time_avg_ms": round(self.run_time_total / completed * 1000, 3),
+            "run_time_max_ms": round(self.run_time_max * 1000, 3),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+password_pool = PasswordPool(PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_QUEUE)
+
+# In-process caches
+class TTLCache:
+    """Bounded LRU cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+class AsyncResponseCache:
+    """Short-lived cache for expensive reads with single-flight coalescing.
+
+    Concurrent misses for the same key share one computation. ``invalidate``
+    drops cached values and detaches in-flight computations so that results
+    started before a write are never cached.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 256):
+        self._cache = TTLCache(max_size, ttl)
+        self._in_flight = {}
+        self._generation = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key, compute):
+        value = self._cache.get(key)
+        if value is not None:
+            return value
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._finish, key, self._generation))
+        else:
+            self.coalesced += 1
+        # Shielded so a disconnecting client does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _finish(self, key, generation, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if generation == self._generation:
+            self._cache.set(key, task.result())
+
+    def invalidate(self):
+        self._generation += 1
+        self._cache.clear()
+        self._in_flight.clear()
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "in_flight": len(self._in_flight), "coalesced": self.coalesced}
+
+# Authenticated users by token subject; always expires well before the token does
+USER_CACHE_TTL_SECONDS = min(
+    float(os.environ.get("USER_CACHE_TTL_SECONDS", "60")),
+    ACCESS_TOKEN_EXPIRE_MINUTES * 60 / 2
+)
+USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", "10000"))
+user_cache = TTLCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS)
+
+# Admin dashboard reads (stats, users, transactions)
+ADMIN_CACHE_TTL_SECONDS = float(os.environ.get("ADMIN_CACHE_TTL_SECONDS", "5"))
+admin_cache = AsyncResponseCache(ADMIN_CACHE_TTL_SECONDS)
+
 # Enums
 class TransactionType(str, enum.Enum):
     DEPOSIT = "deposit"
@@ -51,6 +582,13 @@ class UserRole(str, enum.Enum):
     USER = "user"
     ADMIN = "admin"
 
+# Money is stored as integer cents and exposed as reais in the API
+def to_cents(amount: float) -> int:
+    return int((Decimal(str(amount)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+def from_cents(cents: int) -> float:
+    return cents / 100
+
 # Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -90,10 +628,20 @@ class Account(BaseModel):
     user_id: str
     account_number: str = Field(default_factory=lambda: str(uuid.uuid4())[:8].upper())
     account_type: AccountType
-    balance: float = 0.0
+    balance_cents: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
 
+    @computed_field
+    @property
+    def balance(self) -> float:
+        return from_cents(self.balance_cents)
+
+    def to_document(self) -> dict:
+        document = self.dict()
+        document.pop("balance")
+        return document
+
 class AccountCreate(BaseModel):
     account_type: AccountType
 
@@ -101,12 +649,52 @@ class Transaction(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     from_account_id: Optional[str] = None
     to_account_id: Optional[str] = None
-    amount: float
+    amount_cents: int
     transaction_type: TransactionType
     description: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     user_id: str
 
+    @computed_field
+    @property
+    def amount(self) -> float:
+        return from_cents(self.amount_cents)
+
+    def to_document(self) -> dict:
+        document = self.dict()
+        document.pop("amount")
+        return document
+
+class PostingDirection(str, enum.Enum):
+    DEBIT = "debit"
+    CREDIT = "credit"
+
+class AccountEntry(BaseModel):
+    """A posting as the account owner sees it in the account history."""
+    id: str
+    transaction_id: str
+    account_id: str
+    counterparty_account_id: Optional[str] = None
+    direction: PostingDirection
+    amount_cents: int
+    transaction_type: TransactionType
+    description: str
+    timestamp: datetime
+
+    @computed_field
+    @property
+    def amount(self) -> float:
+        return from_cents(self.amount_cents)
+
+class Posting(AccountEntry):
+    # The user who started the transaction, which for a credit is the counterparty
+    user_id: str
+
+    def to_document(self) -> dict:
+        document = self.dict()
+        document.pop("amount")
+        return document
+
 class TransactionCreate(BaseModel):
     to_account_id: Optional[str] = None
     amount: float
@@ -119,6 +707,21 @@ class TransferRequest(BaseModel):
     amount: float
     description: str
 
+class BatchTransferRequest(BaseModel):
+    transfers: List[TransferRequest]
+
+class BatchTransferItemResult(BaseModel):
+    index: int
+    success: bool
+    transaction_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchTransferResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchTransferItemResult]
+    new_balances: Dict[str, float]
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -129,6 +732,7 @@ class AdminStats(BaseModel):
     total_transactions: int
     total_balance: float
     active_users: int
+    # Transactions in the last 7 UTC calendar days, today included
     recent_transactions: int
 
 class UserWithAccounts(BaseModel):
@@ -144,6 +748,12 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -160,10 +770,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-        user = await db.users.find_one({"email": email})
+        cached_user = user_cache.get(email)
+        if cached_user is not None:
+            return cached_user
+        user = await db.users.find_one({"email": email}, USER_PROJECTION)
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
-        return User(**user)
+        current_user = User(**user)
+        user_cache.set(email, current_user)
+        return current_user
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
@@ -172,10 +787,803 @@ async def get_current_admin(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+# Balance mutations
+# Largest amount in cents a float still carries exactly, far below the int64 limit
+MAX_AMOUNT_CENTS = 2 ** 53
+
+def amount_error(amount: float) -> Optional[str]:
+    """Return why ``amount`` cannot be moved, or None when it is valid."""
+    # The JSON body may carry NaN, Infinity or 1e300, all of which pass float validation
+    if not math.isfinite(amount):
+        return "Amount must be a finite number"
+    if abs(amount) * 100 > MAX_AMOUNT_CENTS:
+        return "Amount is too large"
+    if to_cents(amount) <= 0:
+        return "Amount must be positive"
+    return None
+
+def parse_amount(amount: float) -> int:
+    error = amount_error(amount)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    return to_cents(amount)
+
+async def apply_balance_change(account_filter: dict, delta: int, session=None):
+    """Atomically add ``delta`` cents to the matching account's balance in one round trip.
+
+    Debits (negative deltas) only match while the balance covers them. Returns the
+    updated account, or None when no account matched.
+    """
+    query = dict(account_filter)
+    if delta < 0:
+        query["balance_cents"] = {"$gte": -delta}
+    return await db.accounts.find_one_and_update(
+        query,
+        {"$inc": {"balance_cents": delta}},
+        projection={"_id": 0, "balance_cents": 1},
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+
+# Ledger
+def postings_for(transaction: Transaction) -> List[Posting]:
+    """Split a transaction into its debit and/or credit postings.
+
+    Posting ids derive from the transaction id, so rebuilding them is idempotent.
+    """
+    sides = (
+        (PostingDirection.DEBIT, transaction.from_account_id, transaction.to_account_id),
+        (PostingDirection.CREDIT, transaction.to_account_id, transaction.from_account_id),
+    )
+    return [
+        Posting(
+            id=f"{transaction.id}:{direction.value}",
+            transaction_id=transaction.id,
+            account_id=account_id,
+            counterparty_account_id=counterparty_account_id,
+            direction=direction,
+            amount_cents=transaction.amount_cents,
+            transaction_type=transaction.transaction_type,
+            description=transaction.description,
+            timestamp=transaction.timestamp,
+            user_id=transaction.user_id
+        )
+        for direction, account_id, counterparty_account_id in sides
+        if account_id
+    ]
+
+async def insert_ledger_entries(transactions: List[Transaction], session=None):
+    """Insert transaction records together with their per-account postings."""
+    postings = [posting.to_document() for transaction in transactions for posting in postings_for(transaction)]
+    await db.transactions.insert_many(
+        [transaction.to_document() for transaction in transactions], ordered=False, session=session
+    )
+    await db.postings.insert_many(postings, ordered=False, session=session)
+
+async def reconstruct_balance_cents(account_id: str) -> int:
+    pipeline = [
+        {"$match": {"account_id": account_id}},
+        {"$group": {"_id": None, "balance_cents": {"$sum": {"$cond": [
+            {"$eq": ["$direction", PostingDirection.CREDIT.value]},
+            "$amount_cents",
+            {"$multiply": ["$amount_cents", -1]},
+        ]}}}},
+    ]
+    rows = await db.postings.aggregate(pipeline).to_list(1)
+    return rows[0]["balance_cents"] if rows else 0
+
+async def raise_debit_failure(account_filter: dict, not_found_detail: str, session=None):
+    # Only reached when the guarded debit matched nothing
+    if await db.accounts.find_one(account_filter, EXISTS_PROJECTION, session=session):
+        raise HTTPException(status_code=400, detail="Insufficient balance")
+    raise HTTPException(status_code=404, detail=not_found_detail)
+
+# Multi-document transactions
+MONGO_TRANSACTIONS = os.environ.get("MONGO_TRANSACTIONS", "auto")  # auto | on | off
+TRANSACTION_MAX_ATTEMPTS = int(os.environ.get("TRANSACTION_MAX_ATTEMPTS", "5"))
+TRANSACTION_BACKOFF_SECONDS = float(os.environ.get("TRANSACTION_BACKOFF_SECONDS", "0.01"))
+TRANSACTION_BACKOFF_MAX_SECONDS = float(os.environ.get("TRANSACTION_BACKOFF_MAX_SECONDS", "0.5"))
+
+class TransactionMetrics:
+    def __init__(self):
+        self.enabled = False
+        self.committed = 0
+        self.failed = 0
+        self.transient_retries = 0
+        self.commit_retries = 0
+        self.commit_time_total = 0.0
+        self.commit_time_max = 0.0
+
+    def record_commit(self, seconds: float):
+        self.committed += 1
+        self.commit_time_total += seconds
+        self.commit_time_max = max(self.commit_time_max, seconds)
+
+    def stats(self) -> dict:
+        committed = self.committed or 1
+        return {
+            "enabled": self.enabled,
+            "committed": self.committed,
+            "failed": self.failed,
+            "transient_retries": self.transient_retries,
+            "commit_retries": self.commit_retries,
+            "commit_time_avg_ms": round(self.commit_time_total / committed * 1000, 3),
+            "commit_time_max_ms": round(self.commit_time_max * 1000, 3),
+        }
+
+transaction_metrics = TransactionMetrics()
+
+async def detect_transaction_support() -> bool:
+    if MONGO_TRANSACTIONS != "auto":
+        return MONGO_TRANSACTIONS == "on"
+    # Transactions need a replica set member or a mongos router
+    hello = await client.admin.command("hello")
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+async def transaction_backoff(attempt: int):
+    delay = min(TRANSACTION_BACKOFF_MAX_SECONDS, TRANSACTION_BACKOFF_SECONDS * 2 ** (attempt - 1))
+    await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+async def run_in_transaction(operation):
+    """Run ``operation(session)`` inside a MongoDB transaction and return its result.
+
+    The whole operation is retried on TransientTransactionError and the commit
+    on UnknownTransactionCommitResult, with bounded exponential backoff. When
+    transactions are unavailable the operation runs once with ``session=None``.
+    """
+    if not transaction_metrics.enabled:
+        return await operation(None)
+
+    async with await client.start_session() as session:
+        attempt = 0
+        while True:
+            attempt += 1
+            session.start_transaction()
+            try:
+                result = await operation(session)
+            except PyMongoError as exc:
+                if session.in_transaction:
+                    await session.abort_transaction()
+                if exc.has_error_label("TransientTransactionError") and attempt < TRANSACTION_MAX_ATTEMPTS:
+                    transaction_metrics.transient_retries += 1
+                    await transaction_backoff(attempt)
+                    continue
+                transaction_metrics.failed += 1
+                raise
+            except BaseException:
+                if session.in_transaction:
+                    await session.abort_transaction()
+                raise
+
+            commit_attempt = 0
+            while True:
+                commit_attempt += 1
+                started = time.perf_counter()
+                try:
+                    await session.commit_transaction()
+                except PyMongoError as exc:
+                    if exc.has_error_label("UnknownTransactionCommitResult") and commit_attempt < TRANSACTION_MAX_ATTEMPTS:
+                        transaction_metrics.commit_retries += 1
+                        await transaction_backoff(commit_attempt)
+                        continue
+                    if exc.has_error_label("TransientTransactionError") and attempt < TRANSACTION_MAX_ATTEMPTS:
+                        transaction_metrics.transient_retries += 1
+                        await transaction_backoff(attempt)
+                        break
+                    transaction_metrics.failed += 1
+                    raise
+                transaction_metrics.record_commit(time.perf_counter() - started)
+                return result
+
+# Per-account locks
+LOCK_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+LOCK_STATS_MAX_ACCOUNTS = int(os.environ.get("LOCK_STATS_MAX_ACCOUNTS", "1000"))
+
+class AccountLockManager:
+    """In-process keyed locks that serialize mutations of the same account.
+
+    Locks are held in a WeakValueDictionary, so a lock is dropped once no
+    coroutine holds or waits on it. Multi-account acquisitions always lock in
+    sorted id order, which rules out deadlocks between opposite transfers.
+    """
+
+    def __init__(self, max_tracked_accounts: int):
+        self._locks = weakref.WeakValueDictionary()
+        self._contention = OrderedDict()
+        self.max_tracked_accounts = max_tracked_accounts
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, *account_ids):
+        held = []
+        try:
+            for account_id in sorted(set(account_ids)):
+                lock = self._locks.get(account_id)
+                if lock is None:
+                    lock = asyncio.Lock()
+                    self._locks[account_id] = lock
+                started = time.perf_counter()
+                await lock.acquire()
+                held.append(lock)
+                self._record_wait(account_id, time.perf_counter() - started)
+            yield
+        finally:
+            for lock in reversed(held):
+                lock.release()
+
+    def _record_wait(self, account_id: str, seconds: float):
+        stats = self._contention.pop(account_id, None)
+        if stats is None:
+            stats = {"acquired": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "histogram": [0] * (len(LOCK_WAIT_BUCKETS_MS) + 1)}
+        self._contention[account_id] = stats
+        while len(self._contention) > self.max_tracked_accounts:
+            self._contention.popitem(last=False)
+
+        wait_ms = seconds * 1000
+        stats["acquired"] += 1
+        stats["wait_ms_total"] += wait_ms
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+        bucket = next((i for i, bound in enumerate(LOCK_WAIT_BUCKETS_MS) if wait_ms <= bound), len(LOCK_WAIT_BUCKETS_MS))
+        stats["histogram"][bucket] += 1
+
+    def stats(self, top: int = 10) -> dict:
+        hottest = sorted(self._contention.items(), key=lambda item: item[1]["wait_ms_total"], reverse=True)[:top]
+        return {
+            "active_locks": len(self._locks),
+            "histogram_buckets_ms": [*LOCK_WAIT_BUCKETS_MS, "+Inf"],
+            "hot_accounts": [
+                {
+                    "account_id": account_id,
+                    "acquired": stats["acquired"],
+                    "wait_ms_total": round(stats["wait_ms_total"], 3),
+                    "wait_ms_max": round(stats["wait_ms_max"], 3),
+                    "histogram": stats["histogram"],
+                }
+                for account_id, stats in hottest
+            ],
+        }
+
+account_locks = AccountLockManager(LOCK_STATS_MAX_ACCOUNTS)
+
+# Idempotency keys for money-moving requests
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS = int(os.environ.get("IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS", "60"))
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+idempotency_cache = TTLCache(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS)
+
+# Idempotency-Key claim held by the request being executed, set by run_idempotent
+current_idempotency_claim = contextvars.ContextVar("current_idempotency_claim", default=None)
+
+def request_fingerprint(payload: BaseModel) -> str:
+    return hashlib.sha256(json.dumps(payload.dict(), sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def lease_time() -> datetime:
+    # BSON dates keep milliseconds only; truncate so a claim reads back unchanged
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+async def claim_idempotency_key(record_id: str, fingerprint: str):
+    """Claim ``record_id`` for execution.
+
+    Returns ``(owner, None)`` when this request now owns the key, or
+    ``(None, record)`` with the existing record otherwise. A claim that is still
+    in progress after IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS belongs to a worker that
+    died or stalled before storing its response, and is taken over under a new
+    owner token.
+    """
+    now, owner = lease_time(), uuid.uuid4().hex
+    try:
+        await db.idempotency_keys.insert_one({
+            "_id": record_id,
+            "fingerprint": fingerprint,
+            "response": None,
+            "owner": owner,
+            "created_at": now,
+            "claimed_at": now,
+        })
+        return owner, None
+    except DuplicateKeyError:
+        pass
+
+    record = await db.idempotency_keys.find_one(
+        {"_id": record_id}, {"fingerprint": 1, "response": 1, "created_at": 1, "claimed_at": 1}
+    )
+    if record is None or record["response"] is not None or record["fingerprint"] != fingerprint:
+        return None, record
+    # Claims from before leases existed only have created_at
+    claimed_at = record.get("claimed_at") or record["created_at"]
+    if claimed_at > now - timedelta(seconds=IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS):
+        return None, record
+    taken = await db.idempotency_keys.update_one(
+        {"_id": record_id, "response": None, "claimed_at": record.get("claimed_at")},
+        {"$set": {"owner": owner, "claimed_at": now}}
+    )
+    return (owner, None) if taken.modified_count else (None, record)
+
+def lost_claim() -> HTTPException:
+    return HTTPException(status_code=409, detail="Idempotency-Key was taken over by a retry of this request")
+
+async def confirm_idempotent_claim(session=None):
+    """Check the current request still owns its Idempotency-Key and renew the lease.
+
+    Money endpoints call this first thing in ``apply(session)``, after taking the
+    account locks: time spent waiting on a lock counts against the lease, and a
+    retry may have taken the key over meanwhile. Raising 409 before any balance
+    change keeps the request from being applied twice, and aborts the
+    transaction when transactions are on.
+    """
+    claim = current_idempotency_claim.get()
+    if claim is not None:
+        renewed = await db.idempotency_keys.update_one(
+            {"_id": claim["_id"], "owner": claim["owner"], "response": None},
+            {"$set": {"claimed_at": lease_time()}},
+            session=session
+        )
+        if not renewed.matched_count:
+            raise lost_claim()
+
+async def store_idempotent_response(result: dict, session=None) -> dict:
+    """Store ``result`` on the Idempotency-Key claim of the current request, if any.
+
+    Money endpoints call this from inside ``apply(session)`` so that, with
+    transactions on, the response commits or aborts together with the mutation.
+    """
+    claim = current_idempotency_claim.get()
+    if claim is not None:
+        await store_claimed_response(claim, result, session=session)
+    return result
+
+async def store_claimed_response(claim: dict, result: dict, session=None):
+    stored = await db.idempotency_keys.update_one(
+        {"_id": claim["_id"], "owner": claim["owner"], "response": None},
+        {"$set": {"response": result}},
+        session=session
+    )
+    if not stored.modified_count:
+        raise lost_claim()
+    claim["stored"] = True
+
+async def run_idempotent(key: Optional[str], user_id: str, scope: str, payload: BaseModel, response: Response, execute):
+    """Execute ``execute()`` at most once per ``Idempotency-Key``.
+
+    The key is claimed with an insert before executing, so concurrent duplicates
+    get a 409 instead of running twice; a claim left in progress past its lease
+    is recovered by the next retry. Successful responses are stored in
+    db.idempotency_keys (expired by a TTL index) and in a hot in-process cache,
+    and replayed verbatim. Failed executions release the key so they can be retried.
+    """
+    if not key:
+        return await execute()
+
+    record_id = f"{user_id}:{scope}:{key}"
+    fingerprint = request_fingerprint(payload)
+    record = idempotency_cache.get(record_id)
+    if record is None:
+        owner, record = await claim_idempotency_key(record_id, fingerprint)
+        if owner is not None:
+            claim = {"_id": record_id, "owner": owner, "stored": False}
+            token = current_idempotency_claim.set(claim)
+            try:
+                result = await execute()
+                if not claim["stored"]:
+                    await store_claimed_response(claim, result)
+            except BaseException:
+                await db.idempotency_keys.delete_one({"_id": record_id, "owner": owner, "response": None})
+                raise
+            finally:
+                current_idempotency_claim.reset(token)
+            idempotency_cache.set(record_id, {"fingerprint": fingerprint, "response": result})
+            return result
+        if record is None or record["response"] is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+    idempotency_cache.set(record_id, record)
+    response.headers[IDEMPOTENT_REPLAY_HEADER] = "true"
+    return record["response"]
+
+# Indexes
+INDEX_MODE = os.environ.get("INDEX_MODE", "ensure")  # ensure | check | off
+
+REQUIRED_INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="users_email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="users_id_unique", unique=True),
+    ],
+    "accounts": [
+        IndexModel([("id", ASCENDING)], name="accounts_id_unique", unique=True),
+        IndexModel([("account_number", ASCENDING)], name="accounts_account_number_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="accounts_user_id"),
+    ],
+    "transactions": [
+        IndexModel([("id", ASCENDING)], name="transactions_id_unique", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+            name="transactions_user_id_timestamp_id"
+        ),
+        IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)], name="transactions_timestamp_id"),
+    ],
+    "postings": [
+        IndexModel([("id", ASCENDING)], name="postings_id_unique", unique=True),
+        IndexModel(
+            [("account_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+            name="postings_account_id_timestamp_id"
+        ),
+    ],
+    "idempotency_keys": [
+        IndexModel([("created_at", ASCENDING)], name="idempotency_keys_ttl", expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS),
+    ],
+}
+
+index_report = {}
+
+def index_options(info: dict) -> tuple:
+    """The options that change what an index enforces, as (unique, expireAfterSeconds)."""
+    ttl = info.get("expireAfterSeconds")
+    return bool(info.get("unique", False)), None if ttl is None else int(ttl)
+
+async def ensure_indexes(mode: str = INDEX_MODE) -> dict:
+    """Make sure every index in REQUIRED_INDEXES exists.
+
+    ``ensure`` builds whatever is missing, ``check`` raises if anything is missing
+    and ``off`` skips the whole thing. Indexes are matched by key pattern and by
+    their ``unique`` and ``expireAfterSeconds`` options, so equivalent indexes
+    created under another name count as present. An index with the right keys
+    but other options counts as missing in ``check`` mode and is an error in
+    ``ensure`` mode, since it cannot be rebuilt without dropping it first.
+    """
+    report = {"mode": mode, "built": [], "existing": [], "missing": [], "mismatched": [], "seconds": 0.0}
+    if mode == "off":
+        return report
+
+    started = time.perf_counter()
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        existing = [
+            (list(info["key"]), index_options(info)) for info in (await collection.index_information()).values()
+        ]
+        missing = []
+        for index in indexes:
+            name = f"{collection_name}.{index.document['name']}"
+            key = list(index.document["key"].items())
+            same_key = [options for existing_key, options in existing if existing_key == key]
+            if index_options(index.document) in same_key:
+                report["existing"].append(name)
+            elif same_key:
+                report["missing" if mode == "check" else "mismatched"].append(name)
+            else:
+                missing.append(index)
+                report["missing" if mode == "check" else "built"].append(name)
+        if missing and mode != "check":
+            await collection.create_indexes(missing)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+
+    if report["missing"]:
+        raise RuntimeError(f"Required indexes missing: {', '.join(report['missing'])}")
+    if report["mismatched"]:
+        raise RuntimeError(
+            f"Indexes exist with other unique/expireAfterSeconds options, drop them to rebuild: "
+            f"{', '.join(report['mismatched'])}"
+        )
+    logger.info(
+        "Indexes ready in %.3fs (built: %s, existing: %d)",
+        report["seconds"], ", ".join(report["built"]) or "none", len(report["existing"])
+    )
+    return report
+
+# Account statements
+STATEMENT_BATCH_SIZE = int(os.environ.get("STATEMENT_BATCH_SIZE", "1000"))
+STATEMENT_FIELDS = (
+    "timestamp", "transaction_id", "transaction_type", "direction",
+    "amount", "counterparty_account_id", "description",
+)
+
+def posting_query(account_id: str, from_: Optional[datetime], to: Optional[datetime],
+                  transaction_type: Optional[TransactionType]) -> dict:
+    # Shaped to be served from the (account_id, timestamp, id) postings index
+    query = {"account_id": account_id}
+    if from_ or to:
+        query["timestamp"] = {}
+        if from_:
+            query["timestamp"]["$gte"] = from_
+        if to:
+            query["timestamp"]["$lt"] = to
+    if transaction_type:
+        query["transaction_type"] = transaction_type.value
+    return query
+
+def format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+async def get_statement_account(account_id: str, current_user: User) -> dict:
+    account = await db.accounts.find_one({"id": account_id, "user_id": current_user.id}, {"_id": 0, "account_number": 1})
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return account
+
+async def stream_statement(query: dict, output_format: str):
+    """Yield statement rows oldest first, straight from a cursor, in chunks of STATEMENT_BATCH_SIZE rows.
+
+    Only one cursor batch and one output chunk are held in memory at a time.
+    Amounts are signed: credits positive, debits negative.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if output_format == "csv":
+        writer.writerow(STATEMENT_FIELDS)
+
+    projection = {"_id": 0, "id": 0, "account_id": 0, "user_id": 0}
+    cursor = db.postings.find(query, projection).sort([("timestamp", ASCENDING), ("id", ASCENDING)])
+    rows = 0
+    async for posting in cursor.batch_size(STATEMENT_BATCH_SIZE):
+        cents = posting["amount_cents"]
+        if posting["direction"] == PostingDirection.DEBIT.value:
+            cents = -cents
+        if output_format == "csv":
+            writer.writerow((
+                posting["timestamp"].isoformat(), posting["transaction_id"], posting["transaction_type"],
+                posting["direction"], format_cents(cents), posting.get("counterparty_account_id") or "",
+                posting["description"],
+            ))
+        else:
+            buffer.write(json.dumps({
+                "timestamp": posting["timestamp"].isoformat(),
+                "transaction_id": posting["transaction_id"],
+                "transaction_type": posting["transaction_type"],
+                "direction": posting["direction"],
+                "amount": from_cents(cents),
+                "amount_cents": cents,
+                "counterparty_account_id": posting.get("counterparty_account_id"),
+                "description": posting["description"],
+            }) + "\n")
+        rows += 1
+        if rows % STATEMENT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+# Fast JSON responses
+FAST_JSON_RESPONSES = os.environ.get("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+CENTS_FIELDS = {"balance": "balance_cents", "amount": "amount_cents"}
+
+# Read projections: fetch only the stored fields a response model uses
+def model_projection(model) -> dict:
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+USER_PROJECTION = model_projection(User)
+ACCOUNT_PROJECTION = model_projection(Account)
+TRANSACTION_PROJECTION = model_projection(Transaction)
+ACCOUNT_ENTRY_PROJECTION = model_projection(AccountEntry)
+EXISTS_PROJECTION = {"_id": 1}
+
+def add_computed_fields(document: dict, model) -> dict:
+    for name in model.model_computed_fields:
+        document[name] = from_cents(document[CENTS_FIELDS[name]])
+    return document
+
+def list_response(documents: List[dict], model, response: Optional[Response] = None):
+    """Serialize documents fetched with ``model_projection(model)`` for a list endpoint.
+
+    By default the documents are handed to FastAPI, which validates them once
+    against the route's response_model. With FAST_JSON_RESPONSES enabled they
+    skip validation and go straight to orjson.
+    """
+    if not FAST_JSON_RESPONSES:
+        return documents
+    for document in documents:
+        add_computed_fields(document, model)
+    headers = {}
+    if response is not None and NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return ORJSONResponse(documents, headers=headers)
+
+# Keyset pagination over (timestamp, id), newest first
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(document: dict) -> str:
+    payload = json.dumps({"timestamp": document["timestamp"].isoformat(), "id": document["id"]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        timestamp = datetime.fromisoformat(payload["timestamp"])
+        last_id = str(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "id": {"$lt": last_id}},
+    ]}
+
+async def fetch_page(collection, query: dict, cursor: Optional[str], limit: int, response: Response,
+                     skip: int = 0, projection: Optional[dict] = None) -> List[dict]:
+    """Fetch one newest-first page and advertise the following page in ``X-Next-Cursor``."""
+    if cursor:
+        query = {"$and": [query, decode_cursor(cursor)]}
+    find = collection.find(query, projection).sort([("timestamp", DESCENDING), ("id", DESCENDING)])
+    if skip:
+        find = find.skip(skip)
+    documents = await find.limit(limit + 1).to_list(limit + 1)
+    if len(documents) > limit:
+        documents = documents[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(documents[-1])
+    return documents
+
+# Materialized admin statistics
+# db.stats holds a single running-totals document; db.stats_daily holds one
+# transaction counter per UTC day, used for the recent-transactions window.
+STATS_ID = "global"
+STATS_WINDOW_DAYS = 7
+STATS_RECONCILE_INTERVAL_SECONDS = float(os.environ.get("STATS_RECONCILE_INTERVAL_SECONDS", "300"))
+STATS_FIELDS = ("total_users", "active_users", "total_accounts", "total_transactions", "total_balance_cents")
+STATS_PROJECTION = {"_id": 0, **{field: 1 for field in STATS_FIELDS}}
+
+stats_reconcile_report = {}
+
+def stats_day(timestamp: datetime) -> str:
+    return timestamp.strftime("%Y-%m-%d")
+
+def stats_window_start() -> str:
+    # STATS_WINDOW_DAYS calendar days counting today, so the window never spans more than that
+    return stats_day(datetime.utcnow() - timedelta(days=STATS_WINDOW_DAYS - 1))
+
+async def bump_stats(transactions_by_day: Optional[dict] = None, **deltas):
+    """Apply incremental changes to the materialized statistics."""
+    increments = {field: value for field, value in deltas.items() if value}
+    if increments:
+        await db.stats.update_one({"_id": STATS_ID}, {"$inc": increments}, upsert=True)
+    for day, count in (transactions_by_day or {}).items():
+        await db.stats_daily.update_one({"_id": day}, {"$inc": {"transactions": count}}, upsert=True)
+
+async def record_transaction_stats(transaction: Transaction, balance_delta: int = 0):
+    # Called after commit: inside transactions the shared stats document would
+    # turn every pair of concurrent money movements into a write conflict
+    await bump_stats(
+        transactions_by_day={stats_day(transaction.timestamp): 1},
+        total_transactions=1,
+        total_balance_cents=balance_delta
+    )
+
+async def compute_daily_transaction_counts(match: Optional[dict] = None) -> dict:
+    pipeline = [
+        {"$match": {**(match or {}), "timestamp": {"$gte": datetime.strptime(stats_window_start(), "%Y-%m-%d")}}},
+        {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}, "count": {"$sum": 1}}},
+    ]
+    return {row["_id"]: row["count"] async for row in db.transactions.aggregate(pipeline)}
+
+async def reconcile_stats() -> dict:
+    """Recompute the materialized statistics from source collections and report drift.
+
+    Increments that land while the recount runs are overwritten and picked up
+    again by the next reconciliation.
+    """
+    started = time.perf_counter()
+    totals, actual_days, stored, stored_days = await asyncio.gather(
+        compute_stats_totals(),
+        compute_daily_transaction_counts(),
+        db.stats.find_one({"_id": STATS_ID}, STATS_PROJECTION),
+        db.stats_daily.find({"_id": {"$gte": stats_window_start()}}, {"transactions": 1}).to_list(None),
+    )
+    stored = stored or {}
+    stored_days = {row["_id"]: row["transactions"] for row in stored_days}
+
+    drift = {
+        field: totals[field] - stored.get(field, 0)
+        for field in STATS_FIELDS
+        if totals[field] != stored.get(field, 0)
+    }
+    for day in set(actual_days) | set(stored_days):
+        if actual_days.get(day, 0) != stored_days.get(day, 0):
+            drift[f"transactions:{day}"] = actual_days.get(day, 0) - stored_days.get(day, 0)
+
+    await db.stats.replace_one(
+        {"_id": STATS_ID}, {"_id": STATS_ID, **{field: totals[field] for field in STATS_FIELDS}}, upsert=True
+    )
+    await db.stats_daily.delete_many({"_id": {"$lt": stats_window_start()}})
+    for day in set(actual_days) | set(stored_days):
+        await db.stats_daily.replace_one(
+            {"_id": day}, {"_id": day, "transactions": actual_days.get(day, 0)}, upsert=True
+        )
+
+    report = {
+        "reconciled_at": datetime.utcnow(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "drift": drift,
+    }
+    if drift:
+        logger.warning("Admin stats drift corrected: %s", drift)
+    stats_reconcile_report.clear()
+    stats_reconcile_report.update(report)
+    return report
+
+async def read_materialized_stats() -> AdminStats:
+    stored, recent_days = await asyncio.gather(
+        db.stats.find_one({"_id": STATS_ID}, STATS_PROJECTION),
+        db.stats_daily.find({"_id": {"$gte": stats_window_start()}}, {"transactions": 1}).to_list(None),
+    )
+    if stored is None:
+        await reconcile_stats()
+        return await read_materialized_stats()
+    return admin_stats_from_totals(stored, sum(row["transactions"] for row in recent_days))
+
+async def run_stats_reconciliation():
+    while True:
+        await asyncio.sleep(STATS_RECONCILE_INTERVAL_SECONDS)
+        try:
+            await reconcile_stats()
+        except Exception:
+            logger.exception("Admin stats reconciliation failed")
+
+# Schema migrations
+MONEY_CENTS_MIGRATION = "money_cents"
+
+def cents_expression(field: str) -> dict:
+    return {"$toLong": {"$round": [{"$multiply": [{"$ifNull": [f"${field}", 0]}, 100]}, 0]}}
+
+async def migrate_money_to_cents() -> dict:
+    """Convert float ``balance``/``amount`` fields to integer ``balance_cents``/``amount_cents``.
+
+    Safe to re-run: only documents without the cents field are touched.
+    """
+    accounts = await db.accounts.update_many(
+        {"balance_cents": {"$exists": False}},
+        [{"$set": {"balance_cents": cents_expression("balance")}}, {"$unset": "balance"}]
+    )
+    transactions = await db.transactions.update_many(
+        {"amount_cents": {"$exists": False}},
+        [{"$set": {"amount_cents": cents_expression("amount")}}, {"$unset": "amount"}]
+    )
+    stats_report = await reconcile_stats()
+    await db.migrations.update_one(
+        {"_id": MONEY_CENTS_MIGRATION}, {"$setOnInsert": {"applied_at": datetime.utcnow()}}, upsert=True
+    )
+    return {
+        "accounts_migrated": accounts.modified_count,
+        "transactions_migrated": transactions.modified_count,
+        "stats_drift": stats_report["drift"],
+    }
+
+async def backfill_postings(batch_size: int = 1000) -> dict:
+    """Create missing postings for existing transactions; safe to re-run."""
+    written = 0
+    batch = []
+    async for document in db.transactions.find({}, TRANSACTION_PROJECTION).batch_size(batch_size):
+        batch.extend(postings_for(Transaction(**document)))
+        if len(batch) >= batch_size:
+            written += await upsert_postings(batch)
+            batch = []
+    if batch:
+        written += await upsert_postings(batch)
+    return {"postings_created": written}
+
+async def upsert_postings(postings: List[Posting]) -> int:
+    result = await db.postings.bulk_write([
+        UpdateOne({"id": posting.id}, {"$setOnInsert": posting.to_document()}, upsert=True)
+        for posting in postings
+    ], ordered=False)
+    return result.upserted_count
+
+async def check_money_migration():
+    if await db.migrations.find_one({"_id": MONEY_CENTS_MIGRATION}, EXISTS_PROJECTION):
+        return
+    legacy = (
+        await db.accounts.find_one({"balance_cents": {"$exists": False}}, EXISTS_PROJECTION)
+        or await db.transactions.find_one({"amount_cents": {"$exists": False}}, EXISTS_PROJECTION)
+    )
+    if legacy:
+        raise RuntimeError("Float money fields found; run `python backend/manage.py migrate-cents` first")
+    await db.migrations.update_one(
+        {"_id": MONEY_CENTS_MIGRATION}, {"$setOnInsert": {"applied_at": datetime.utcnow()}}, upsert=True
+    )
+
 # Create default admin user on startup
 async def create_default_admin():
     admin_email = "admin@seubank.com"
-    existing_admin = await db.users.find_one({"email": admin_email})
+    existing_admin = await db.users.find_one({"email": admin_email}, EXISTS_PROJECTION)
     
     if not existing_admin:
         admin_data = {
@@ -186,36 +1594,42 @@ async def create_default_admin():
             "role": UserRole.ADMIN
         }
         
-        hashed_password = hash_password(admin_data["password"])
+        hashed_password = await hash_password_async(admin_data["password"])
         user_dict = admin_data.copy()
         user_dict.pop("password")
         user_dict["hashed_password"] = hashed_password
         user_obj = User(**user_dict)
         
-        await db.users.insert_one(user_obj.dict())
+        await db.users.insert_one({**user_obj.dict(), "hashed_password": hashed_password})
+        await bump_stats(total_users=1, active_users=int(user_obj.is_active))
         print(f"✅ Default admin created: {admin_email} / admin123")
 
 # Auth Routes
 @api_router.post("/auth/register", response_model=Token)
 async def register(user_data: UserCreate):
     # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await db.users.find_one({"email": user_data.email}, EXISTS_PROJECTION)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     user_dict = user_data.dict()
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
     user_obj = User(**user_dict)
     
-    await db.users.insert_one(user_obj.dict())
+    await db.users.insert_one({**user_obj.dict(), "hashed_password": hashed_password})
     
     # Create default checking account for regular users
     if user_obj.role == UserRole.USER:
         account = Account(user_id=user_obj.id, account_type=AccountType.CHECKING)
-        await db.accounts.insert_one(account.dict())
+        await db.accounts.insert_one(account.to_document())
+    await bump_stats(
+        total_users=1,
+        active_users=int(user_obj.is_active),
+        total_accounts=int(user_obj.role == UserRole.USER)
+    )
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -227,8 +1641,8 @@ async def register(user_data: UserCreate):
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_credentials: UserLogin):
-    user = await db.users.find_one({"email": user_credentials.email})
-    if not user or not verify_password(user_credentials.password, user["hashed_password"]):
+    user = await db.users.find_one({"email": user_credentials.email}, {"_id": 0, "email": 1, "hashed_password": 1})
+    if not user or not await verify_password_async(user_credentials.password, user["hashed_password"]):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -241,131 +1655,342 @@ async def login(user_credentials: UserLogin):
 # Account Routes
 @api_router.get("/accounts", response_model=List[Account])
 async def get_accounts(current_user: User = Depends(get_current_user)):
-    accounts = await db.accounts.find({"user_id": current_user.id}).to_list(100)
-    return [Account(**account) for account in accounts]
+    accounts = await db.accounts.find({"user_id": current_user.id}, ACCOUNT_PROJECTION).to_list(100)
+    return list_response(accounts, Account)
 
 @api_router.post("/accounts", response_model=Account)
 async def create_account(account_data: AccountCreate, current_user: User = Depends(get_current_user)):
     account = Account(user_id=current_user.id, account_type=account_data.account_type)
-    await db.accounts.insert_one(account.dict())
+    await db.accounts.insert_one(account.to_document())
+    await bump_stats(total_accounts=1)
     return account
 
 @api_router.get("/accounts/{account_id}", response_model=Account)
 async def get_account(account_id: str, current_user: User = Depends(get_current_user)):
-    account = await db.accounts.find_one({"id": account_id, "user_id": current_user.id})
+    account = await db.accounts.find_one({"id": account_id, "user_id": current_user.id}, ACCOUNT_PROJECTION)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     return Account(**account)
 
+@api_router.get("/accounts/{account_id}/transactions", response_model=List[AccountEntry])
+async def get_account_transactions(
+    account_id: str,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    from_: Optional[datetime] = Query(None, alias="from", description="Inclusive lower bound on timestamp"),
+    to: Optional[datetime] = Query(None, description="Exclusive upper bound on timestamp"),
+    transaction_type: Optional[TransactionType] = Query(None, alias="type"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    account = await db.accounts.find_one({"id": account_id, "user_id": current_user.id}, EXISTS_PROJECTION)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    
+    query = posting_query(account_id, from_, to, transaction_type)
+    entries = await fetch_page(db.postings, query, cursor, limit, response, projection=ACCOUNT_ENTRY_PROJECTION)
+    return list_response(entries, AccountEntry, response)
+
+@api_router.get("/accounts/{account_id}/statement.csv")
+async def export_statement_csv(
+    account_id: str,
+    current_user: User = Depends(get_current_user),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    transaction_type: Optional[TransactionType] = Query(None, alias="type")
+):
+    account = await get_statement_account(account_id, current_user)
+    rows = stream_statement(posting_query(account_id, from_, to, transaction_type), "csv")
+    return StreamingResponse(rows, media_type="text/csv", headers={
+        "Content-Disposition": f'attachment; filename="statement-{account["account_number"]}.csv"'
+    })
+
+@api_router.get("/accounts/{account_id}/statement.ndjson")
+async def export_statement_ndjson(
+    account_id: str,
+    current_user: User = Depends(get_current_user),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    transaction_type: Optional[TransactionType] = Query(None, alias="type")
+):
+    account = await get_statement_account(account_id, current_user)
+    rows = stream_statement(posting_query(account_id, from_, to, transaction_type), "ndjson")
+    return StreamingResponse(rows, media_type="application/x-ndjson", headers={
+        "Content-Disposition": f'attachment; filename="statement-{account["account_number"]}.ndjson"'
+    })
+
 # Transaction Routes
 @api_router.get("/transactions", response_model=List[Transaction])
-async def get_transactions(current_user: User = Depends(get_current_user)):
-    transactions = await db.transactions.find({"user_id": current_user.id}).sort("timestamp", -1).to_list(100)
-    return [Transaction(**transaction) for transaction in transactions]
+async def get_transactions(
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    transactions = await fetch_page(
+        db.transactions, {"user_id": current_user.id}, cursor, limit, response, projection=TRANSACTION_PROJECTION
+    )
+    return list_response(transactions, Transaction, response)
 
 @api_router.post("/transactions/deposit")
-async def deposit_money(transaction_data: TransactionCreate, current_user: User = Depends(get_current_user)):
+async def deposit_money(
+    transaction_data: TransactionCreate,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None)
+):
     if transaction_data.transaction_type != TransactionType.DEPOSIT:
         raise HTTPException(status_code=400, detail="Invalid transaction type")
+    amount_cents = parse_amount(transaction_data.amount)
     
-    # Get account
-    account = await db.accounts.find_one({"id": transaction_data.to_account_id, "user_id": current_user.id})
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    # Update account balance
-    new_balance = account["balance"] + transaction_data.amount
-    await db.accounts.update_one(
-        {"id": transaction_data.to_account_id}, 
-        {"$set": {"balance": new_balance}}
-    )
+    async def apply(session):
+        await confirm_idempotent_claim(session=session)
+        # Update account balance
+        account = await apply_balance_change(
+            {"id": transaction_data.to_account_id, "user_id": current_user.id},
+            amount_cents,
+            session=session
+        )
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+        
+        # Create transaction record
+        transaction = Transaction(
+            to_account_id=transaction_data.to_account_id,
+            amount_cents=amount_cents,
+            transaction_type=TransactionType.DEPOSIT,
+            description=transaction_data.description,
+            user_id=current_user.id
+        )
+        await insert_ledger_entries([transaction], session=session)
+        result = await store_idempotent_response(
+            {"message": "Deposit successful", "new_balance": from_cents(account["balance_cents"])}, session=session
+        )
+        return result, transaction
     
-    # Create transaction record
-    transaction = Transaction(
-        to_account_id=transaction_data.to_account_id,
-        amount=transaction_data.amount,
-        transaction_type=TransactionType.DEPOSIT,
-        description=transaction_data.description,
-        user_id=current_user.id
-    )
-    await db.transactions.insert_one(transaction.dict())
+    async def execute():
+        async with account_locks.acquire(transaction_data.to_account_id):
+            result, transaction = await run_in_transaction(apply)
+        await record_transaction_stats(transaction, amount_cents)
+        return result
     
-    return {"message": "Deposit successful", "new_balance": new_balance}
+    return await run_idempotent(idempotency_key, current_user.id, "deposit", transaction_data, response, execute)
 
 @api_router.post("/transactions/withdrawal")
-async def withdraw_money(transaction_data: TransactionCreate, current_user: User = Depends(get_current_user)):
+async def withdraw_money(
+    transaction_data: TransactionCreate,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None)
+):
     if transaction_data.transaction_type != TransactionType.WITHDRAWAL:
         raise HTTPException(status_code=400, detail="Invalid transaction type")
+    amount_cents = parse_amount(transaction_data.amount)
     
-    # Get account
-    account = await db.accounts.find_one({"id": transaction_data.to_account_id, "user_id": current_user.id})
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    # Check sufficient balance
-    if account["balance"] < transaction_data.amount:
-        raise HTTPException(status_code=400, detail="Insufficient balance")
-    
-    # Update account balance
-    new_balance = account["balance"] - transaction_data.amount
-    await db.accounts.update_one(
-        {"id": transaction_data.to_account_id}, 
-        {"$set": {"balance": new_balance}}
-    )
+    async def apply(session):
+        await confirm_idempotent_claim(session=session)
+        # Update account balance, guarded by a sufficient balance
+        account_filter = {"id": transaction_data.to_account_id, "user_id": current_user.id}
+        account = await apply_balance_change(account_filter, -amount_cents, session=session)
+        if not account:
+            await raise_debit_failure(account_filter, "Account not found", session=session)
+        
+        # Create transaction record
+        transaction = Transaction(
+            from_account_id=transaction_data.to_account_id,
+            amount_cents=amount_cents,
+            transaction_type=TransactionType.WITHDRAWAL,
+            description=transaction_data.description,
+            user_id=current_user.id
+        )
+        await insert_ledger_entries([transaction], session=session)
+        result = await store_idempotent_response(
+            {"message": "Withdrawal successful", "new_balance": from_cents(account["balance_cents"])}, session=session
+        )
+        return result, transaction
     
-    # Create transaction record
-    transaction = Transaction(
-        from_account_id=transaction_data.to_account_id,
-        amount=transaction_data.amount,
-        transaction_type=TransactionType.WITHDRAWAL,
-        description=transaction_data.description,
-        user_id=current_user.id
-    )
-    await db.transactions.insert_one(transaction.dict())
+    async def execute():
+        async with account_locks.acquire(transaction_data.to_account_id):
+            result, transaction = await run_in_transaction(apply)
+        await record_transaction_stats(transaction, -amount_cents)
+        return result
     
-    return {"message": "Withdrawal successful", "new_balance": new_balance}
+    return await run_idempotent(idempotency_key, current_user.id, "withdrawal", transaction_data, response, execute)
 
 @api_router.post("/transactions/transfer")
-async def transfer_money(transfer_data: TransferRequest, current_user: User = Depends(get_current_user)):
-    # Get from account
-    from_account = await db.accounts.find_one({"id": transfer_data.from_account_id, "user_id": current_user.id})
-    if not from_account:
-        raise HTTPException(status_code=404, detail="From account not found")
-    
-    # Get to account
-    to_account = await db.accounts.find_one({"id": transfer_data.to_account_id})
-    if not to_account:
-        raise HTTPException(status_code=404, detail="To account not found")
-    
-    # Check sufficient balance
-    if from_account["balance"] < transfer_data.amount:
-        raise HTTPException(status_code=400, detail="Insufficient balance")
+async def transfer_money(
+    transfer_data: TransferRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None)
+):
+    amount_cents = parse_amount(transfer_data.amount)
     
-    # Update balances
-    new_from_balance = from_account["balance"] - transfer_data.amount
-    new_to_balance = to_account["balance"] + transfer_data.amount
+    async def apply(session):
+        await confirm_idempotent_claim(session=session)
+        # Debit from account, guarded by a sufficient balance
+        from_filter = {"id": transfer_data.from_account_id, "user_id": current_user.id}
+        from_account = await apply_balance_change(from_filter, -amount_cents, session=session)
+        if not from_account:
+            await raise_debit_failure(from_filter, "From account not found", session=session)
+        new_from_balance = from_account["balance_cents"]
+        
+        # Credit to account, refunding the debit if it does not exist
+        to_account = await apply_balance_change(
+            {"id": transfer_data.to_account_id}, amount_cents, session=session
+        )
+        if not to_account:
+            await apply_balance_change(
+                {"id": transfer_data.from_account_id}, amount_cents, session=session
+            )
+            raise HTTPException(status_code=404, detail="To account not found")
+        if transfer_data.to_account_id == transfer_data.from_account_id:
+            new_from_balance = to_account["balance_cents"]
+        
+        # Create transaction record
+        transaction = Transaction(
+            from_account_id=transfer_data.from_account_id,
+            to_account_id=transfer_data.to_account_id,
+            amount_cents=amount_cents,
+            transaction_type=TransactionType.TRANSFER,
+            description=transfer_data.description,
+            user_id=current_user.id
+        )
+        await insert_ledger_entries([transaction], session=session)
+        result = await store_idempotent_response(
+            {"message": "Transfer successful", "new_from_balance": from_cents(new_from_balance)}, session=session
+        )
+        return result, transaction
     
-    await db.accounts.update_one(
-        {"id": transfer_data.from_account_id}, 
-        {"$set": {"balance": new_from_balance}}
-    )
-    await db.accounts.update_one(
-        {"id": transfer_data.to_account_id}, 
-        {"$set": {"balance": new_to_balance}}
-    )
+    async def execute():
+        async with account_locks.acquire(transfer_data.from_account_id, transfer_data.to_account_id):
+            result, transaction = await run_in_transaction(apply)
+        await record_transaction_stats(transaction)
+        return result
     
-    # Create transaction record
-    transaction = Transaction(
-        from_account_id=transfer_data.from_account_id,
-        to_account_id=transfer_data.to_account_id,
-        amount=transfer_data.amount,
-        transaction_type=TransactionType.TRANSFER,
-        description=transfer_data.description,
-        user_id=current_user.id
-    )
-    await db.transactions.insert_one(transaction.dict())
+    return await run_idempotent(idempotency_key, current_user.id, "transfer", transfer_data, response, execute)
+
+BATCH_TRANSFER_MAX_ITEMS = int(os.environ.get("BATCH_TRANSFER_MAX_ITEMS", "1000"))
+
+@api_router.post("/transactions/transfers:batch", response_model=BatchTransferResponse)
+async def batch_transfer(
+    batch: BatchTransferRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """Apply many transfers from the caller's accounts in one request.
+
+    Every item is validated in a single pass against balances read up front;
+    invalid items are reported and skipped. Valid items are applied with one
+    guarded debit per source account, one bulk write for all credits and one
+    insert for all transaction records.
+    """
+    if not batch.transfers:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one transfer")
+    if len(batch.transfers) > BATCH_TRANSFER_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {BATCH_TRANSFER_MAX_ITEMS} transfers")
     
-    return {"message": "Transfer successful", "new_from_balance": new_from_balance}
+    async def apply(session):
+        await confirm_idempotent_claim(session=session)
+        from_ids = list({item.from_account_id for item in batch.transfers})
+        to_ids = list({item.to_account_id for item in batch.transfers})
+        # Sequential on purpose: a session must not run two commands at once
+        source_accounts = await db.accounts.find(
+            {"id": {"$in": from_ids}, "user_id": current_user.id}, {"_id": 0, "id": 1, "balance_cents": 1}, session=session
+        ).to_list(None)
+        destination_accounts = await db.accounts.find(
+            {"id": {"$in": to_ids}}, {"_id": 0, "id": 1}, session=session
+        ).to_list(None)
+        balances = {account["id"]: account["balance_cents"] for account in source_accounts}
+        destinations = {account["id"] for account in destination_accounts}
+        
+        # Validate every item against running balances
+        results, transactions, deltas = [], [], {}
+        for index, item in enumerate(batch.transfers):
+            error = amount_error(item.amount)
+            amount_cents = 0 if error else to_cents(item.amount)
+            if error is None and item.from_account_id not in balances:
+                error = "From account not found"
+            elif error is None and item.to_account_id not in destinations:
+                error = "To account not found"
+            elif error is None and balances[item.from_account_id] < amount_cents:
+                error = "Insufficient balance"
+            if error:
+                results.append(BatchTransferItemResult(index=index, success=False, error=error))
+                continue
+            
+            balances[item.from_account_id] -= amount_cents
+            if item.to_account_id in balances:
+                balances[item.to_account_id] += amount_cents
+            deltas[item.from_account_id] = deltas.get(item.from_account_id, 0) - amount_cents
+            deltas[item.to_account_id] = deltas.get(item.to_account_id, 0) + amount_cents
+            transaction = Transaction(
+                from_account_id=item.from_account_id,
+                to_account_id=item.to_account_id,
+                amount_cents=amount_cents,
+                transaction_type=TransactionType.TRANSFER,
+                description=item.description,
+                user_id=current_user.id
+            )
+            transactions.append(transaction)
+            results.append(BatchTransferItemResult(index=index, success=True, transaction_id=transaction.id))
+        
+        # Net debits first, guarded against balances that moved since the read
+        new_balances, debited = {}, []
+        for account_id, delta in deltas.items():
+            if delta >= 0:
+                continue
+            account = await apply_balance_change({"id": account_id}, delta, session=session)
+            if not account:
+                for refund_id, refund in debited:
+                    await apply_balance_change({"id": refund_id}, -refund, session=session)
+                raise HTTPException(status_code=409, detail="Account balance changed during batch, please retry")
+            debited.append((account_id, delta))
+            new_balances[account_id] = from_cents(account["balance_cents"])
+        
+        credited = {account_id: delta for account_id, delta in deltas.items() if delta > 0}
+        credits = [UpdateOne({"id": account_id}, {"$inc": {"balance_cents": delta}}) for account_id, delta in credited.items()]
+        if credits:
+            result = await db.accounts.bulk_write(credits, ordered=False, session=session)
+            if result.matched_count != len(credits):
+                # A destination disappeared after validation: undo the credits that
+                # landed and refund the debits, as transfer_money does
+                remaining = await db.accounts.find(
+                    {"id": {"$in": list(credited)}}, {"_id": 0, "id": 1}, session=session
+                ).to_list(None)
+                for account in remaining:
+                    await apply_balance_change({"id": account["id"]}, -credited[account["id"]], session=session)
+                for refund_id, refund in debited:
+                    await apply_balance_change({"id": refund_id}, -refund, session=session)
+                raise HTTPException(status_code=409, detail="To account not found during batch, please retry")
+        if transactions:
+            await insert_ledger_entries(transactions, session=session)
+        
+        for account_id, delta in deltas.items():
+            if delta >= 0 and account_id in balances:
+                new_balances[account_id] = from_cents(balances[account_id])
+        result = await store_idempotent_response(BatchTransferResponse(
+            succeeded=len(transactions),
+            failed=len(results) - len(transactions),
+            results=results,
+            new_balances=new_balances
+        ).dict(), session=session)
+        return result, transactions
+    
+    async def execute():
+        account_ids = [account_id for item in batch.transfers for account_id in (item.from_account_id, item.to_account_id)]
+        async with account_locks.acquire(*account_ids):
+            result, transactions = await run_in_transaction(apply)
+        if transactions:
+            transactions_by_day = {}
+            for transaction in transactions:
+                day = stats_day(transaction.timestamp)
+                transactions_by_day[day] = transactions_by_day.get(day, 0) + 1
+            await bump_stats(transactions_by_day=transactions_by_day, total_transactions=len(transactions))
+        return result
+    
+    return await run_idempotent(idempotency_key, current_user.id, "transfers:batch", batch, response, execute)
 
 # User Profile Routes
 @api_router.get("/profile", response_model=User)
@@ -373,84 +1998,118 @@ async def get_profile(current_user: User = Depends(get_current_user)):
     return current_user
 
 # Admin Routes
-@api_router.get("/admin/stats", response_model=AdminStats)
-async def get_admin_stats(current_admin: User = Depends(get_current_admin)):
-    # Get statistics
-    total_users = await db.users.count_documents({})
-    total_accounts = await db.accounts.count_documents({})
-    total_transactions = await db.transactions.count_documents({})
-    active_users = await db.users.count_documents({"is_active": True})
-    
-    # Get recent transactions count (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_transactions = await db.transactions.count_documents({"timestamp": {"$gte": seven_days_ago}})
-    
-    # Calculate total balance across all accounts
-    accounts = await db.accounts.find({}).to_list(1000)
-    total_balance = sum(account["balance"] for account in accounts)
-    
+async def compute_stats_totals() -> dict:
+    """Compute the admin statistics inside MongoDB, with the per-collection queries run concurrently."""
+    window_start = datetime.strptime(stats_window_start(), "%Y-%m-%d")
+
+    async def user_counts():
+        pipeline = [{"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "active": {"$sum": {"$cond": [{"$eq": ["$is_active", True]}, 1, 0]}},
+        }}]
+        rows = await db.users.aggregate(pipeline).to_list(1)
+        return rows[0] if rows else {"total": 0, "active": 0}
+
+    async def account_totals():
+        pipeline = [{"$group": {"_id": None, "total": {"$sum": 1}, "balance_cents": {"$sum": "$balance_cents"}}}]
+        rows = await db.accounts.aggregate(pipeline).to_list(1)
+        return rows[0] if rows else {"total": 0, "balance_cents": 0}
+
+    users, accounts, total_transactions, recent_transactions = await asyncio.gather(
+        user_counts(),
+        account_totals(),
+        db.transactions.count_documents({}),
+        db.transactions.count_documents({"timestamp": {"$gte": window_start}}),
+    )
+
+    return {
+        "total_users": users["total"],
+        "active_users": users["active"],
+        "total_accounts": accounts["total"],
+        "total_transactions": total_transactions,
+        "total_balance_cents": accounts["balance_cents"],
+        "recent_transactions": recent_transactions,
+    }
+
+def admin_stats_from_totals(totals: dict, recent_transactions: int) -> AdminStats:
     return AdminStats(
-        total_users=total_users,
-        total_accounts=total_accounts,
-        total_transactions=total_transactions,
-        total_balance=total_balance,
-        active_users=active_users,
+        total_users=totals.get("total_users", 0),
+        total_accounts=totals.get("total_accounts", 0),
+        total_transactions=totals.get("total_transactions", 0),
+        total_balance=from_cents(totals.get("total_balance_cents", 0)),
+        active_users=totals.get("active_users", 0),
         recent_transactions=recent_transactions
     )
 
-@api_router.get("/admin/users", response_model=List[UserWithAccounts])
-async def get_all_users(current_admin: User = Depends(get_current_admin)):
-    users = await db.users.find({}).to_list(1000)
+async def compute_admin_stats() -> AdminStats:
+    totals = await compute_stats_totals()
+    return admin_stats_from_totals(totals, totals["recent_transactions"])
+
+@api_router.get("/admin/stats", response_model=AdminStats)
+async def get_admin_stats(current_admin: User = Depends(get_current_admin)):
+    return await admin_cache.get_or_compute(("stats",), read_materialized_stats)
+
+@api_router.post("/admin/stats/reconcile")
+async def reconcile_admin_stats(current_admin: User = Depends(get_current_admin)):
+    report = await reconcile_stats()
+    admin_cache.invalidate()
+    return report
+
+async def build_users_with_accounts(users: List[dict]) -> List[dict]:
+    """Attach accounts, balances and transaction counts to projected ``users``.
+
+    Uses two batched queries for the whole page instead of two per user, and
+    returns plain UserWithAccounts-shaped documents.
+    """
+    user_ids = [user["id"] for user in users]
+
+    async def load_accounts():
+        accounts_by_user = {user_id: [] for user_id in user_ids}
+        async for account in db.accounts.find({"user_id": {"$in": user_ids}}, ACCOUNT_PROJECTION):
+            accounts_by_user[account["user_id"]].append(add_computed_fields(account, Account))
+        return accounts_by_user
+
+    async def load_transaction_counts():
+        pipeline = [
+            {"$match": {"user_id": {"$in": user_ids}}},
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+        ]
+        return {row["_id"]: row["count"] async for row in db.transactions.aggregate(pipeline)}
+
+    accounts_by_user, transaction_counts = await asyncio.gather(load_accounts(), load_transaction_counts())
+
     result = []
-    
     for user_data in users:
-        user = User(**user_data)
-        # Get user's accounts
-        accounts = await db.accounts.find({"user_id": user.id}).to_list(100)
-        accounts_list = [Account(**account) for account in accounts]
-        
-        # Calculate total balance
-        total_balance = sum(account.balance for account in accounts_list)
-        
-        # Get transaction count
-        transaction_count = await db.transactions.count_documents({"user_id": user.id})
-        
-        result.append(UserWithAccounts(
-            user=user,
-            accounts=accounts_list,
-            total_balance=total_balance,
-            transaction_count=transaction_count
-        ))
-    
+        accounts_list = accounts_by_user[user_data["id"]]
+        result.append({
+            "user": user_data,
+            "accounts": accounts_list,
+            "total_balance": from_cents(sum(account["balance_cents"] for account in accounts_list)),
+            "transaction_count": transaction_counts.get(user_data["id"], 0),
+        })
     return result
 
+async def list_users_with_accounts(limit: int = 1000) -> List[dict]:
+    users = await db.users.find({}, USER_PROJECTION).to_list(limit)
+    return await build_users_with_accounts(users)
+
+@api_router.get("/admin/users", response_model=List[UserWithAccounts])
+async def get_all_users(current_admin: User = Depends(get_current_admin)):
+    users = await admin_cache.get_or_compute(("users",), list_users_with_accounts)
+    return list_response(users, UserWithAccounts)
+
 @api_router.get("/admin/users/{user_id}", response_model=UserWithAccounts)
 async def get_user_by_id(user_id: str, current_admin: User = Depends(get_current_admin)):
-    user_data = await db.users.find_one({"id": user_id})
+    user_data = await db.users.find_one({"id": user_id}, USER_PROJECTION)
     if not user_data:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user = User(**user_data)
-    # Get user's accounts
-    accounts = await db.accounts.find({"user_id": user.id}).to_list(100)
-    accounts_list = [Account(**account) for account in accounts]
-    
-    # Calculate total balance
-    total_balance = sum(account.balance for account in accounts_list)
-    
-    # Get transaction count
-    transaction_count = await db.transactions.count_documents({"user_id": user.id})
-    
-    return UserWithAccounts(
-        user=user,
-        accounts=accounts_list,
-        total_balance=total_balance,
-        transaction_count=transaction_count
-    )
+    return (await build_users_with_accounts([user_data]))[0]
 
 @api_router.put("/admin/users/{user_id}", response_model=User)
 async def update_user(user_id: str, user_update: UserUpdate, current_admin: User = Depends(get_current_admin)):
-    user_data = await db.users.find_one({"id": user_id})
+    user_data = await db.users.find_one({"id": user_id}, {"_id": 0, "email": 1, "is_active": 1})
     if not user_data:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -458,14 +2117,18 @@ async def update_user(user_id: str, user_update: UserUpdate, current_admin: User
     update_data = {k: v for k, v in user_update.dict().items() if v is not None}
     if update_data:
         await db.users.update_one({"id": user_id}, {"$set": update_data})
+        user_cache.invalidate(user_data["email"])
+        admin_cache.invalidate()
+        if "is_active" in update_data and update_data["is_active"] != user_data.get("is_active", True):
+            await bump_stats(active_users=1 if update_data["is_active"] else -1)
     
     # Return updated user
-    updated_user = await db.users.find_one({"id": user_id})
+    updated_user = await db.users.find_one({"id": user_id}, USER_PROJECTION)
     return User(**updated_user)
 
 @api_router.delete("/admin/users/{user_id}")
 async def delete_user(user_id: str, current_admin: User = Depends(get_current_admin)):
-    user_data = await db.users.find_one({"id": user_id})
+    user_data = await db.users.find_one({"id": user_id}, {"_id": 0, "email": 1, "role": 1, "is_active": 1})
     if not user_data:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -473,58 +2136,217 @@ async def delete_user(user_id: str, current_admin: User = Depends(get_current_ad
     if user_data.get("role") == UserRole.ADMIN:
         raise HTTPException(status_code=400, detail="Cannot delete admin users")
     
-    # Delete user's accounts and transactions
+    # Capture what the user contributes to the admin statistics
+    account_rows, transaction_count, transactions_by_day = await asyncio.gather(
+        db.accounts.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "balance_cents": {"$sum": "$balance_cents"}}},
+        ]).to_list(1),
+        db.transactions.count_documents({"user_id": user_id}),
+        compute_daily_transaction_counts({"user_id": user_id}),
+    )
+    account_totals = account_rows[0] if account_rows else {"count": 0, "balance_cents": 0}
+    
+    # Delete user's accounts, transactions and the postings on those accounts;
+    # counterparties keep their side of any transfer
+    account_ids = await db.accounts.distinct("id", {"user_id": user_id})
     await db.accounts.delete_many({"user_id": user_id})
     await db.transactions.delete_many({"user_id": user_id})
+    await db.postings.delete_many({"account_id": {"$in": account_ids}})
     
     # Delete user
     await db.users.delete_one({"id": user_id})
+    user_cache.invalidate(user_data["email"])
+    admin_cache.invalidate()
+    await bump_stats(
+        transactions_by_day={day: -count for day, count in transactions_by_day.items()},
+        total_users=-1,
+        active_users=-int(user_data.get("is_active", True)),
+        total_accounts=-account_totals["count"],
+        total_transactions=-transaction_count,
+        total_balance_cents=-account_totals["balance_cents"]
+    )
     
     return {"message": "User deleted successfully"}
 
 @api_router.post("/admin/users", response_model=User)
 async def create_user_admin(user_data: AdminUserCreate, current_admin: User = Depends(get_current_admin)):
     # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await db.users.find_one({"email": user_data.email}, EXISTS_PROJECTION)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     user_dict = user_data.dict()
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
     user_obj = User(**user_dict)
     
-    await db.users.insert_one(user_obj.dict())
+    await db.users.insert_one({**user_obj.dict(), "hashed_password": hashed_password})
     
     # Create default checking account for regular users
     if user_obj.role == UserRole.USER:
         account = Account(user_id=user_obj.id, account_type=AccountType.CHECKING)
-        await db.accounts.insert_one(account.dict())
+        await db.accounts.insert_one(account.to_document())
+    await bump_stats(
+        total_users=1,
+        active_users=int(user_obj.is_active),
+        total_accounts=int(user_obj.role == UserRole.USER)
+    )
+    
+    admin_cache.invalidate()
     
     return user_obj
 
 @api_router.get("/admin/transactions", response_model=List[Transaction])
 async def get_all_transactions(
+    response: Response,
     current_admin: User = Depends(get_current_admin),
-    limit: int = Query(100, le=1000),
-    skip: int = Query(0, ge=0)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True)
 ):
-    transactions = await db.transactions.find({}).sort("timestamp", -1).skip(skip).limit(limit).to_list(limit)
-    return [Transaction(**transaction) for transaction in transactions]
+    async def load_page():
+        page_response = Response()
+        transactions = await fetch_page(
+            db.transactions, {}, cursor, limit, page_response, skip=skip, projection=TRANSACTION_PROJECTION
+        )
+        return transactions, page_response.headers.get(NEXT_CURSOR_HEADER)
+
+    transactions, next_cursor = await admin_cache.get_or_compute(("transactions", limit, cursor, skip), load_page)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return list_response(transactions, Transaction, response)
+
+@api_router.get("/admin/accounts/{account_id}/ledger-check")
+async def check_account_ledger(account_id: str, current_admin: User = Depends(get_current_admin)):
+    account, ledger_cents = await asyncio.gather(
+        db.accounts.find_one({"id": account_id}, {"_id": 0, "balance_cents": 1}),
+        reconstruct_balance_cents(account_id),
+    )
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return {
+        "account_id": account_id,
+        "balance": from_cents(account["balance_cents"]),
+        "ledger_balance": from_cents(ledger_cents),
+        "difference": from_cents(account["balance_cents"] - ledger_cents),
+    }
 
 @api_router.get("/admin/transactions/{transaction_id}", response_model=Transaction)
 async def get_transaction_by_id(transaction_id: str, current_admin: User = Depends(get_current_admin)):
-    transaction = await db.transactions.find_one({"id": transaction_id})
+    transaction = await db.transactions.find_one({"id": transaction_id}, TRANSACTION_PROJECTION)
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return Transaction(**transaction)
 
+@api_router.get("/admin/performance")
+async def get_performance_stats(current_admin: User = Depends(get_current_admin)):
+    return {
+        "password_pool": password_pool.stats(),
+        "user_cache": user_cache.stats(),
+        "admin_cache": admin_cache.stats(),
+        "idempotency_cache": idempotency_cache.stats(),
+        "indexes": index_report,
+        "stats_reconciliation": stats_reconcile_report,
+        "transactions": transaction_metrics.stats(),
+        "account_locks": account_locks.stats(),
+        "mongo_pool": mongo_pool_monitor.stats(),
+    }
+
+@api_router.get("/admin/query-report")
+async def get_query_report(
+    current_admin: User = Depends(get_current_admin),
+    limit: int = Query(20, ge=1, le=500),
+    sort_by: str = Query("total_ms", pattern="^(total_ms|max_ms|count|slow_count)$")
+):
+    return mongo_command_monitor.report(limit=limit, sort_by=sort_by)
+
 @api_router.get("/")
 async def root():
     return {"message": "SeuBank API - Professional Banking Platform with Admin Panel"}
 
+def resolve_route_template(scope) -> str:
+    # Label by route template, never by raw path, to keep metric cardinality bounded
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+def render_pool_metrics() -> List[str]:
+    # Point-in-time values read from the in-process pools and caches
+    values = (
+        ("seubank_password_pool_pending", "gauge", password_pool.stats()["pending"]),
+        ("seubank_password_pool_completed_total", "counter", password_pool.completed),
+        ("seubank_password_pool_rejected_total", "counter", password_pool.rejected),
+        ("seubank_user_cache_hits_total", "counter", user_cache.hits),
+        ("seubank_user_cache_misses_total", "counter", user_cache.misses),
+        ("seubank_admin_cache_coalesced_total", "counter", admin_cache.coalesced),
+        ("seubank_transaction_retries_total", "counter",
+         transaction_metrics.transient_retries + transaction_metrics.commit_retries),
+    )
+    return [line for name, metric_type, value in values for line in (f"# TYPE {name} {metric_type}", f"{name} {value}")]
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    lines = [line for metric in METRICS for line in metric.render()]
+    lines.extend(render_pool_metrics())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+class RequestMetricsMiddleware:
+    """Count, time and track in-flight HTTP requests per route template.
+
+    Plain ASGI rather than ``@app.middleware("http")``, which hands back the
+    response once its headers are ready: a request is only finished when the
+    last body chunk has been sent, so streamed statements are timed in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = resolve_route_template(scope)
+        current_route.set(route)
+        labels = (scope["method"], route)
+        http_requests_in_flight.inc(labels)
+        started = time.perf_counter()
+        status, finished = 500, False
+
+        def finish():
+            nonlocal finished
+            if not finished:
+                finished = True
+                http_requests_in_flight.inc(labels, -1)
+                http_request_duration.observe(labels, time.perf_counter() - started)
+                http_requests_total.inc((scope["method"], route, str(status)))
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            finish()
+
+app.add_middleware(RequestMetricsMiddleware)
+
+@app.exception_handler(WaitQueueTimeoutError)
+async def mongo_pool_exhausted(request: Request, exc: WaitQueueTimeoutError):
+    # The pool stayed saturated for MONGO_WAIT_QUEUE_TIMEOUT_MS; shed load instead of queueing forever
+    logger.warning("MongoDB pool checkout timed out on %s: %s", current_route.get(), exc)
+    return JSONResponse(status_code=503, content={"detail": "Server busy, please retry"}, headers={"Retry-After": "1"})
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -534,19 +2356,34 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAY_HEADER],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+background_tasks = []
+
+async def warm_mongo_pool():
+    # Open minPoolSize connections up front so the first requests don't pay the handshakes
+    if MONGO_MIN_POOL_SIZE > 0:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(MONGO_MIN_POOL_SIZE)))
+        logger.info("MongoDB pool warmed: %s", mongo_pool_monitor.stats()["connections"])
 
 @app.on_event("startup")
 async def startup_event():
+    await warm_mongo_pool()
+    transaction_metrics.enabled = await detect_transaction_support()
+    logger.info("MongoDB transactions %s", "enabled" if transaction_metrics.enabled else "disabled")
+    index_report.update(await ensure_indexes())
+    await check_money_migration()
+    # bump_stats upserts, so seed the totals first on a populated database that has none yet
+    if not await db.stats.find_one({"_id": STATS_ID}, EXISTS_PROJECTION):
+        await reconcile_stats()
     await create_default_admin()
+    if STATS_RECONCILE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_stats_reconciliation()))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    for task in background_tasks:
+        task.cancel()
+    client.close()
+    password_pool.shutdown()
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Shared fixtures: the backend runs in-process against the in-memory store
+(DB_BACKEND=memory), so the suite needs no MongoDB server.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ["DB_BACKEND"] = "memory"
+os.environ["DB_NAME"] = "seubank_test"
+os.environ["STATS_RECONCILE_INTERVAL_SECONDS"] = "0"
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+import server  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def run():
+    # One loop for the whole session: module-level locks and caches outlive a test
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def client(run):
+    async def reset():
+        for name in await server.db.list_collection_names():
+            await server.db.drop_collection(name)
+        server.user_cache.clear()
+        server.idempotency_cache.clear()
+        server.admin_cache.invalidate()
+        await server.startup_event()
+
+    run(reset())
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+    yield http
+    run(http.aclose())
+
+
+@pytest.fixture
+def make_user(client):
+    async def make_user(email: str, password: str = "Senha@123") -> dict:
+        """Register a user and return its auth headers and default checking account id."""
+        response = await client.post("/api/auth/register", json={
+            "email": email, "password": password, "full_name": "Test User", "phone": "+55 11 90000-0000"
+        })
+        assert response.status_code == 200, response.text
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        accounts = (await client.get("/api/accounts", headers=headers)).json()
+        return {"headers": headers, "account_id": accounts[0]["id"]}
+
+    return make_user
+
+
+
+@pytest.fixture
+def admin_headers(run, client):
+    response = run(client.post("/api/auth/login", json={"email": "admin@seubank.com", "password": "admin123"}))
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,17 @@
+"""Request helpers shared by the test modules."""
+
+import httpx
+
+import server
+
+
+async def deposit(client: httpx.AsyncClient, user: dict, amount: float, account_id: str = None):
+    return await client.post("/api/transactions/deposit", headers=user["headers"], json={
+        "to_account_id": account_id or user["account_id"], "amount": amount,
+        "transaction_type": "deposit", "description": "test deposit"
+    })
+
+
+async def balance(account_id: str) -> int:
+    account = await server.db.accounts.find_one({"id": account_id}, {"_id": 0, "balance_cents": 1})
+    return account["balance_cents"]
@@ -0,0 +1,23 @@
+import server
+from tests.helpers import deposit
+
+
+def test_account_history_does_not_show_the_senders_user_id(run, client, make_user):
+    async def scenario():
+        payer, payee = await make_user("payer@seubank.com"), await make_user("payee@seubank.com")
+        await deposit(client, payer, 100)
+        response = await client.post("/api/transactions/transfer", headers=payer["headers"], json={
+            "from_account_id": payer["account_id"], "to_account_id": payee["account_id"],
+            "amount": 25, "description": "rent"
+        })
+        assert response.status_code == 200, response.text
+
+        response = await client.get(f"/api/accounts/{payee['account_id']}/transactions", headers=payee["headers"])
+        assert response.status_code == 200, response.text
+        entry, = response.json()
+        assert set(entry) == set(server.AccountEntry.model_fields) | {"amount"}
+        assert (entry["direction"], entry["counterparty_account_id"], entry["amount"]) == (
+            "credit", payer["account_id"], 25.0
+        )
+
+    run(scenario())
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import server
+from server import Account, AccountType, Transaction, TransactionType, User
+from tests.helpers import deposit
+
+
+def test_stats_start_from_existing_data(run, client, make_user, admin_headers):
+    async def scenario():
+        # A database populated before materialized stats existed
+        users = [User(email=f"legacy{i}@seubank.com", full_name="Legacy", phone="+55 11 90000-0000") for i in range(50)]
+        await server.db.users.insert_many([{**user.dict(), "hashed_password": "x"} for user in users])
+        await server.db.accounts.insert_many([
+            Account(user_id=user.id, account_type=AccountType.CHECKING, balance_cents=10000).to_document()
+            for user in users
+        ])
+        await server.db.drop_collection("stats")
+        await server.db.drop_collection("stats_daily")
+        await server.startup_event()
+
+        user = await make_user("new@seubank.com")
+        await deposit(client, user, 50)
+        server.admin_cache.invalidate()
+        stats = (await client.get("/api/admin/stats", headers=admin_headers)).json()
+        assert stats["total_users"] == 52
+        assert stats["total_accounts"] == 51
+        assert stats["total_balance"] == 5050.0
+        assert (await server.reconcile_stats())["drift"] == {}
+
+    run(scenario())
+
+
+def test_recent_transactions_cover_at_most_seven_days(run, client, admin_headers):
+    async def scenario():
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        await server.db.transactions.insert_many([
+            Transaction(
+                to_account_id="account", amount_cents=100, transaction_type=TransactionType.DEPOSIT,
+                description="window", user_id="user", timestamp=today - timedelta(days=days)
+            ).to_document()
+            for days in (0, 6, 7)
+        ])
+        await server.reconcile_stats()
+        server.admin_cache.invalidate()
+        stats = (await client.get("/api/admin/stats", headers=admin_headers)).json()
+        assert stats["recent_transactions"] == 2
+        assert (await server.compute_admin_stats()).recent_transactions == 2
+
+    run(scenario())
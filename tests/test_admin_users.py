@@ -0,0 +1,25 @@
+import server
+from tests.helpers import deposit
+
+
+def test_deleting_a_user_keeps_the_counterparty_ledger(run, client, make_user, admin_headers):
+    async def scenario():
+        alice, bob = await make_user("alice@seubank.com"), await make_user("bob@seubank.com")
+        await deposit(client, alice, 50)
+        response = await client.post("/api/transactions/transfer", headers=alice["headers"], json={
+            "from_account_id": alice["account_id"], "to_account_id": bob["account_id"],
+            "amount": 20, "description": "rent"
+        })
+        assert response.status_code == 200, response.text
+        alice_id = (await server.db.accounts.find_one({"id": alice["account_id"]}))["user_id"]
+
+        response = await client.delete(f"/api/admin/users/{alice_id}", headers=admin_headers)
+        assert response.status_code == 200, response.text
+        assert await server.db.postings.count_documents({"account_id": alice["account_id"]}) == 0
+
+        check = await client.get(f"/api/admin/accounts/{bob['account_id']}/ledger-check", headers=admin_headers)
+        assert check.json()["difference"] == 0
+        statement = await client.get(f"/api/accounts/{bob['account_id']}/statement.csv", headers=bob["headers"])
+        assert "rent" in statement.text
+
+    run(scenario())
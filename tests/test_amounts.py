@@ -0,0 +1,49 @@
+import pytest
+
+import server
+from tests.helpers import balance, deposit
+
+
+@pytest.mark.parametrize("amount", ["NaN", "Infinity", "-Infinity", "1e300", "1e17", "0", "-5", "0.001"])
+def test_deposit_rejects_invalid_amounts(run, client, make_user, amount):
+    async def scenario():
+        user = await make_user("saver@seubank.com")
+        # NaN and Infinity are not valid JSON, but the body parser accepts them
+        response = await client.post(
+            "/api/transactions/deposit",
+            headers={**user["headers"], "Content-Type": "application/json"},
+            content=f'{{"to_account_id": "{user["account_id"]}", "amount": {amount}, '
+                    f'"transaction_type": "deposit", "description": "bad"}}',
+        )
+        assert response.status_code == 400, response.text
+        assert await balance(user["account_id"]) == 0
+
+    run(scenario())
+
+
+def test_batch_reports_invalid_amounts_per_item(run, client, make_user):
+    async def scenario():
+        payer, payee = await make_user("payer@seubank.com"), await make_user("payee@seubank.com")
+        await deposit(client, payer, 10)
+        items = ", ".join(
+            f'{{"from_account_id": "{payer["account_id"]}", "to_account_id": "{payee["account_id"]}", '
+            f'"amount": {amount}, "description": "batch"}}'
+            for amount in ("NaN", "1e300", "2.5")
+        )
+        response = await client.post(
+            "/api/transactions/transfers:batch",
+            headers={**payer["headers"], "Content-Type": "application/json"},
+            content=f'{{"transfers": [{items}]}}',
+        )
+        assert response.status_code == 200, response.text
+        assert [item["error"] for item in response.json()["results"]] == [
+            "Amount must be a finite number", "Amount is too large", None
+        ]
+        assert await balance(payee["account_id"]) == 250
+
+    run(scenario())
+
+
+def test_amount_bounds():
+    assert server.amount_error(server.MAX_AMOUNT_CENTS / 100) is None
+    assert server.amount_error(server.MAX_AMOUNT_CENTS / 100 * 2) == "Amount is too large"
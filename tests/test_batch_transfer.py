@@ -0,0 +1,116 @@
+import asyncio
+
+import server
+from tests.helpers import balance, deposit
+
+
+def batch(*items):
+    return {"transfers": [
+        {"from_account_id": source, "to_account_id": destination, "amount": amount, "description": "batch"}
+        for source, destination, amount in items
+    ]}
+
+
+def test_batch_applies_valid_items_and_reports_invalid_ones(run, client, make_user):
+    async def scenario():
+        payer, payee = await make_user("payer@seubank.com"), await make_user("payee@seubank.com")
+        await deposit(client, payer, 100)
+        response = await client.post("/api/transactions/transfers:batch", headers=payer["headers"], json=batch(
+            (payer["account_id"], payee["account_id"], 30),
+            (payer["account_id"], "missing", 10),
+            (payer["account_id"], payee["account_id"], 80),
+            (payer["account_id"], payee["account_id"], 20.5),
+        ))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert (body["succeeded"], body["failed"]) == (2, 2)
+        assert [item["error"] for item in body["results"]] == [
+            None, "To account not found", "Insufficient balance", None
+        ]
+        assert body["new_balances"][payer["account_id"]] == 49.5
+        assert await balance(payer["account_id"]) == 4950
+        assert await balance(payee["account_id"]) == 5050
+        assert await server.db.postings.count_documents({"account_id": payee["account_id"]}) == 2
+
+    run(scenario())
+
+
+def test_batch_refunds_when_a_destination_disappears(run, client, make_user, monkeypatch):
+    async def scenario():
+        payer, payee = await make_user("payer@seubank.com"), await make_user("payee@seubank.com")
+        await deposit(client, payer, 100)
+        bulk_write = server.db.accounts.bulk_write
+
+        async def delete_destination_first(requests, **kwargs):
+            await server.db.accounts.delete_one({"id": payee["account_id"]})
+            return await bulk_write(requests, **kwargs)
+
+        monkeypatch.setattr(server.db.accounts, "bulk_write", delete_destination_first)
+        response = await client.post("/api/transactions/transfers:batch", headers=payer["headers"], json=batch(
+            (payer["account_id"], payee["account_id"], 30),
+        ))
+        assert response.status_code == 409
+        assert await balance(payer["account_id"]) == 10000
+        assert await server.db.transactions.count_documents({"transaction_type": "transfer"}) == 0
+
+    run(scenario())
+
+
+def test_idempotency_key_replays_the_stored_response(run, client, make_user):
+    async def scenario():
+        payer, payee = await make_user("payer@seubank.com"), await make_user("payee@seubank.com")
+        await deposit(client, payer, 100)
+        headers = {**payer["headers"], "Idempotency-Key": "payroll-1"}
+        body = batch((payer["account_id"], payee["account_id"], 25))
+
+        first = await client.post("/api/transactions/transfers:batch", headers=headers, json=body)
+        server.idempotency_cache.clear()
+        replay = await client.post("/api/transactions/transfers:batch", headers=headers, json=body)
+        assert first.status_code == replay.status_code == 200
+        assert replay.json() == first.json()
+        assert replay.headers[server.IDEMPOTENT_REPLAY_HEADER] == "true"
+        assert await balance(payer["account_id"]) == 7500
+
+        changed = batch((payer["account_id"], payee["account_id"], 50))
+        response = await client.post("/api/transactions/transfers:batch", headers=headers, json=changed)
+        assert response.status_code == 422
+
+    run(scenario())
+
+
+def test_opposite_lock_orders_do_not_deadlock(run):
+    async def scenario():
+        order = []
+
+        async def hold(*account_ids):
+            async with server.account_locks.acquire(*account_ids):
+                order.append(account_ids)
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(asyncio.gather(*(
+            hold("a", "b") if i % 2 else hold("b", "a") for i in range(20)
+        )), timeout=5)
+        assert len(order) == 20
+
+    run(scenario())
+
+
+def test_concurrent_opposite_transfers_keep_money_constant(run, client, make_user):
+    async def scenario():
+        alice, bob = await make_user("alice@seubank.com"), await make_user("bob@seubank.com")
+        await deposit(client, alice, 100)
+        await deposit(client, bob, 100)
+
+        def transfer(source, destination):
+            return client.post("/api/transactions/transfer", headers=source["headers"], json={
+                "from_account_id": source["account_id"], "to_account_id": destination["account_id"],
+                "amount": 1, "description": "ping-pong"
+            })
+
+        responses = await asyncio.wait_for(asyncio.gather(*(
+            transfer(alice, bob) if i % 2 else transfer(bob, alice) for i in range(40)
+        )), timeout=30)
+        assert all(response.status_code == 200 for response in responses)
+        assert await balance(alice["account_id"]) + await balance(bob["account_id"]) == 20000
+
+    run(scenario())
@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+from tests.helpers import balance, deposit
+
+
+def deposit_body(account_id, amount=10):
+    return {"to_account_id": account_id, "amount": amount, "transaction_type": "deposit", "description": "retry"}
+
+
+async def leave_claim(user, key, body, age):
+    """Insert the in-progress claim a worker leaves behind when it dies mid-request."""
+    me = (await server.db.accounts.find_one({"id": user["account_id"]}, {"_id": 0, "user_id": 1}))["user_id"]
+    claimed_at = datetime.utcnow() - age
+    await server.db.idempotency_keys.insert_one({
+        "_id": f"{me}:deposit:{key}",
+        "fingerprint": server.request_fingerprint(server.TransactionCreate(**body)),
+        "response": None,
+        "created_at": claimed_at,
+        "claimed_at": claimed_at,
+    })
+
+
+def test_fresh_claim_still_conflicts(run, client, make_user):
+    async def scenario():
+        user = await make_user("retry@seubank.com")
+        body = deposit_body(user["account_id"])
+        await leave_claim(user, "deposit-1", body, timedelta(seconds=1))
+        response = await client.post(
+            "/api/transactions/deposit", headers={**user["headers"], "Idempotency-Key": "deposit-1"}, json=body
+        )
+        assert response.status_code == 409
+        assert await balance(user["account_id"]) == 0
+
+    run(scenario())
+
+
+def test_stale_claim_is_recovered_by_a_retry(run, client, make_user):
+    async def scenario():
+        user = await make_user("retry@seubank.com")
+        headers = {**user["headers"], "Idempotency-Key": "deposit-1"}
+        body = deposit_body(user["account_id"])
+        await leave_claim(user, "deposit-1", body, timedelta(seconds=server.IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS + 1))
+
+        first = await client.post("/api/transactions/deposit", headers=headers, json=body)
+        assert first.status_code == 200, first.text
+        server.idempotency_cache.clear()
+        replay = await client.post("/api/transactions/deposit", headers=headers, json=body)
+        assert replay.json() == first.json()
+        assert replay.headers[server.IDEMPOTENT_REPLAY_HEADER] == "true"
+        assert await balance(user["account_id"]) == 1000
+
+    run(scenario())
+
+
+def test_request_that_lost_its_claim_does_not_apply(run, client, make_user, monkeypatch):
+    async def scenario():
+        user = await make_user("retry@seubank.com")
+        headers = {**user["headers"], "Idempotency-Key": "deposit-1"}
+        body = deposit_body(user["account_id"])
+        monkeypatch.setattr(server, "IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS", 0.2)
+
+        async with server.account_locks.acquire(user["account_id"]):
+            # The first request claims the key, then outlives its lease waiting on the lock
+            first = asyncio.ensure_future(client.post("/api/transactions/deposit", headers=headers, json=body))
+            await asyncio.sleep(0.3)
+            retry = asyncio.ensure_future(client.post("/api/transactions/deposit", headers=headers, json=body))
+            await asyncio.sleep(0.05)
+        responses = sorted([await first, await retry], key=lambda response: response.status_code)
+
+        assert [response.status_code for response in responses] == [200, 409]
+        assert await balance(user["account_id"]) == 1000
+        assert await server.db.transactions.count_documents({"transaction_type": "deposit"}) == 1
+
+    run(scenario())
+
+
+def test_response_is_stored_with_the_mutation(run, client, make_user, monkeypatch):
+    async def scenario():
+        user = await make_user("retry@seubank.com")
+        await deposit(client, user, 100)
+        stored = []
+
+        async def record_transaction_stats(*args, **kwargs):
+            # Runs after the mutation committed: the response must already be there
+            stored.append(await server.db.idempotency_keys.find_one({}, {"_id": 0, "response": 1}))
+
+        monkeypatch.setattr(server, "record_transaction_stats", record_transaction_stats)
+        response = await client.post("/api/transactions/withdrawal", headers={
+            **user["headers"], "Idempotency-Key": "withdrawal-1"
+        }, json={**deposit_body(user["account_id"], 40), "transaction_type": "withdrawal"})
+        assert response.status_code == 200, response.text
+        assert stored == [{"response": response.json()}]
+
+    run(scenario())
@@ -0,0 +1,32 @@
+import pytest
+from pymongo import ASCENDING, IndexModel
+
+import server
+
+
+def replace_index(run, collection_name, index):
+    async def replace():
+        await server.db.drop_collection(collection_name)
+        await server.db[collection_name].create_indexes([index])
+
+    run(replace())
+
+
+def test_equivalent_index_under_another_name_counts_as_present(run, client):
+    replace_index(run, "users", IndexModel([("email", ASCENDING)], name="email_1", unique=True))
+    report = run(server.ensure_indexes("ensure"))
+    assert "users.users_email_unique" in report["existing"]
+    assert report["built"] == ["users.users_id_unique"]
+
+
+@pytest.mark.parametrize("collection_name, index, required", [
+    ("users", IndexModel([("email", ASCENDING)], name="email_1"), "users.users_email_unique"),
+    ("idempotency_keys", IndexModel([("created_at", ASCENDING)], name="created_at_1", expireAfterSeconds=60),
+     "idempotency_keys.idempotency_keys_ttl"),
+])
+def test_index_with_other_options_does_not_count(run, client, collection_name, index, required):
+    replace_index(run, collection_name, index)
+    with pytest.raises(RuntimeError, match=f"missing: .*{required}"):
+        run(server.ensure_indexes("check"))
+    with pytest.raises(RuntimeError, match=f"drop them to rebuild: .*{required}"):
+        run(server.ensure_indexes("ensure"))
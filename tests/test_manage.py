@@ -0,0 +1,21 @@
+import argparse
+from datetime import datetime
+
+import pytest
+
+import manage
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-01-01", datetime(2024, 1, 1)),
+    ("2024-01-01T00:00", datetime(2024, 1, 1)),
+    ("2024-01-01T03:00+03:00", datetime(2024, 1, 1)),
+])
+def test_export_bounds_accept_utc_day_boundaries(value, expected):
+    assert manage.utc_day(value) == expected
+
+
+@pytest.mark.parametrize("value", ["2024-01-01T12:00", "2024-01-01T00:00+03:00", "yesterday"])
+def test_export_bounds_reject_partial_days(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        manage.utc_day(value)
@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta, timezone
+
+from memory_db import MemoryClient
+
+SAO_PAULO = timezone(timedelta(hours=-3))
+
+
+def test_aware_datetimes_are_stored_and_queried_as_naive_utc(run):
+    async def scenario():
+        collection = MemoryClient()["memory_test"]["events"]
+        await collection.insert_one({"_id": 1, "at": datetime(2024, 1, 1, 9, tzinfo=SAO_PAULO)})
+        await collection.insert_one({"_id": 2, "at": datetime(2024, 1, 1, 15)})
+        await collection.update_one({"_id": 2}, {"$set": {"seen": [datetime(2024, 1, 2, tzinfo=timezone.utc)]}})
+
+        first = await collection.find_one({"_id": 1})
+        assert first["at"] == datetime(2024, 1, 1, 12)
+        assert first["at"].tzinfo is None
+        assert (await collection.find_one({"_id": 2}))["seen"] == [datetime(2024, 1, 2)]
+
+        noon = datetime(2024, 1, 1, 9, tzinfo=SAO_PAULO)
+        assert [doc["_id"] for doc in await collection.find({"at": noon}).to_list(None)] == [1]
+        assert [doc["_id"] for doc in await collection.find({"at": {"$gt": noon}}).to_list(None)] == [2]
+        assert await collection.count_documents({"at": {"$in": [noon]}}) == 1
+
+    run(scenario())
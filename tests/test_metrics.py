@@ -0,0 +1,36 @@
+import asyncio
+
+import server
+
+LABELS = ("GET", "unmatched")
+
+
+def test_streamed_response_is_timed_until_its_last_chunk(run):
+    seen_in_flight = []
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for chunk in (b"header\n", b"row\n"):
+            await asyncio.sleep(0.1)
+            seen_in_flight.append(server.http_requests_in_flight.snapshot()[LABELS])
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def scenario():
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        middleware = server.RequestMetricsMiddleware(streaming_app)
+        before = dict(server.http_request_duration.snapshot().get(LABELS, {"sum": 0.0, "count": 0}))
+        await middleware({"type": "http", "method": "GET", "path": "/stream", "headers": []}, receive, send)
+        after = server.http_request_duration.snapshot()[LABELS]
+
+        assert seen_in_flight == [1, 1]
+        assert server.http_requests_in_flight.snapshot()[LABELS] == 0
+        assert after["count"] == before["count"] + 1
+        assert after["sum"] - before["sum"] >= 0.2
+
+    run(scenario())
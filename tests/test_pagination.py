@@ -0,0 +1,67 @@
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+from server import Transaction, TransactionType
+
+
+@pytest.fixture
+def history(run, client, make_user):
+    """A user with 25 transactions, most of them sharing one timestamp."""
+    async def seed():
+        user = await make_user("pages@seubank.com")
+        user_id = (await client.get("/api/profile", headers=user["headers"])).json()["id"]
+        now = datetime.utcnow().replace(microsecond=0)
+        transactions = [
+            Transaction(
+                to_account_id=user["account_id"], amount_cents=100, transaction_type=TransactionType.DEPOSIT,
+                description=f"deposit {i}", user_id=user_id, timestamp=now if i % 3 else now - timedelta(seconds=1)
+            )
+            for i in range(25)
+        ]
+        await server.db.transactions.insert_many([transaction.to_document() for transaction in transactions])
+        user["expected"] = [
+            transaction.id for transaction in sorted(transactions, key=lambda t: (t.timestamp, t.id), reverse=True)
+        ]
+        return user
+
+    return run(seed())
+
+
+def test_pages_cover_shared_timestamps_without_gaps_or_duplicates(run, client, history):
+    async def scenario():
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/transactions", headers=history["headers"], params=params)
+            assert response.status_code == 200, response.text
+            seen.extend(transaction["id"] for transaction in response.json())
+            pages += 1
+            cursor = response.headers.get(server.NEXT_CURSOR_HEADER)
+            if cursor is None:
+                break
+        assert seen == history["expected"]
+        assert pages == 4
+
+    run(scenario())
+
+
+def test_last_page_has_no_next_cursor(run, client, history):
+    response = run(client.get("/api/transactions", headers=history["headers"], params={"limit": 25}))
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 25
+    assert server.NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(b'{"timestamp": "yesterday", "id": "x"}').decode(),
+])
+def test_garbage_cursor_is_rejected(run, client, history, cursor):
+    response = run(client.get("/api/transactions", headers=history["headers"], params={"cursor": cursor}))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
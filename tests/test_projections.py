@@ -0,0 +1,116 @@
+import inspect
+
+import pytest
+
+import server
+from memory_db import MemoryCollection
+from tests.helpers import deposit
+
+READ_METHODS = ("find", "find_one")
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Record (collection, method, projection) for every read the app issues."""
+    calls = []
+    nested = []
+
+    def spy(method_name):
+        original = getattr(MemoryCollection, method_name)
+
+        def record(collection, projection, kwargs):
+            # find_one is built on find; only the outermost call is the app's
+            if not nested:
+                calls.append((collection.name, method_name, kwargs.get("projection", projection)))
+
+        if inspect.iscoroutinefunction(original):
+            async def recorded(self, filter=None, projection=None, *args, **kwargs):
+                record(self, projection, kwargs)
+                nested.append(method_name)
+                try:
+                    return await original(self, filter, projection, *args, **kwargs)
+                finally:
+                    nested.pop()
+        else:
+            def recorded(self, filter=None, projection=None, *args, **kwargs):
+                record(self, projection, kwargs)
+                return original(self, filter, projection, *args, **kwargs)
+
+        return recorded
+
+    for method_name in READ_METHODS:
+        monkeypatch.setattr(MemoryCollection, method_name, spy(method_name))
+    return calls
+
+
+@pytest.fixture
+def seeded(run, client, make_user, admin_headers):
+    async def seed():
+        user = await make_user("reader@seubank.com")
+        await deposit(client, user, 10)
+        transaction = await server.db.transactions.find_one({}, {"_id": 0, "id": 1})
+        user["transaction_id"] = transaction["id"]
+        account = await server.db.accounts.find_one({"id": user["account_id"]}, {"_id": 0, "user_id": 1})
+        user["user_id"] = account["user_id"]
+        # Warm the token cache so the requests below only show their own reads
+        await client.get("/api/profile", headers=user["headers"])
+        await client.get("/api/profile", headers=admin_headers)
+        return user
+
+    return run(seed())
+
+
+def request(run, client, reads, path, headers):
+    reads.clear()
+    response = run(client.get(path, headers=headers))
+    assert response.status_code == 200, response.text
+    # Reads issued through asyncio.gather may land in any order
+    return sorted(reads, key=lambda call: call[:2])
+
+
+def test_get_current_user_projects_the_user_model(run, client, seeded, reads):
+    server.user_cache.clear()
+    assert request(run, client, reads, "/api/profile", seeded["headers"]) == [
+        ("users", "find_one", server.USER_PROJECTION),
+    ]
+
+
+def test_login_reads_only_the_credentials(run, client, seeded, reads):
+    reads.clear()
+    response = run(client.post("/api/auth/login", json={"email": "reader@seubank.com", "password": "Senha@123"}))
+    assert response.status_code == 200, response.text
+    assert reads == [("users", "find_one", {"_id": 0, "email": 1, "hashed_password": 1})]
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/api/accounts", [("accounts", "find", server.ACCOUNT_PROJECTION)]),
+    ("/api/accounts/{account_id}", [("accounts", "find_one", server.ACCOUNT_PROJECTION)]),
+    ("/api/accounts/{account_id}/transactions", [
+        ("accounts", "find_one", server.EXISTS_PROJECTION),
+        ("postings", "find", server.ACCOUNT_ENTRY_PROJECTION),
+    ]),
+    ("/api/transactions", [("transactions", "find", server.TRANSACTION_PROJECTION)]),
+])
+def test_user_reads_project_their_models(run, client, seeded, reads, path, expected):
+    assert request(run, client, reads, path.format(**seeded), seeded["headers"]) == expected
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/api/admin/stats", [
+        ("stats", "find_one", server.STATS_PROJECTION),
+        ("stats_daily", "find", {"transactions": 1}),
+    ]),
+    ("/api/admin/users", [
+        ("accounts", "find", server.ACCOUNT_PROJECTION),
+        ("users", "find", server.USER_PROJECTION),
+    ]),
+    ("/api/admin/users/{user_id}", [
+        ("accounts", "find", server.ACCOUNT_PROJECTION),
+        ("users", "find_one", server.USER_PROJECTION),
+    ]),
+    ("/api/admin/transactions", [("transactions", "find", server.TRANSACTION_PROJECTION)]),
+    ("/api/admin/transactions/{transaction_id}", [("transactions", "find_one", server.TRANSACTION_PROJECTION)]),
+])
+def test_admin_reads_project_their_models(run, client, seeded, reads, admin_headers, path, expected):
+    server.admin_cache.invalidate()
+    assert request(run, client, reads, path.format(**seeded), admin_headers) == expected
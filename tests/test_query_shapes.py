@@ -0,0 +1,67 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from server import command_fingerprint, query_shape
+
+
+@pytest.mark.parametrize("value, shape", [
+    ({"id": "a1", "user_id": "u1"}, {"id": "?", "user_id": "?"}),
+    ({"id": {"$in": ["a1", "a2", "a3"]}}, {"id": {"$in": "?"}}),
+    ({"timestamp": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 2, 1)}}, {"timestamp": {"$gte": "?", "$lt": "?"}}),
+    (
+        {"$and": [{"account_id": "a1"}, {"$or": [
+            {"timestamp": {"$lt": datetime(2024, 1, 1)}},
+            {"timestamp": datetime(2024, 1, 1), "id": {"$lt": "t9"}},
+        ]}]},
+        {"$and": [{"account_id": "?"}, {"$or": [
+            {"timestamp": {"$lt": "?"}},
+            {"timestamp": "?", "id": {"$lt": "?"}},
+        ]}]},
+    ),
+    # Repeated shapes in a list collapse, so batches of any size look alike
+    ([{"q": {"id": "a1"}, "u": {"$inc": {"balance_cents": 500}}}, {"q": {"id": "a2"}, "u": {"$inc": {"balance_cents": -5}}}],
+     [{"q": {"id": "?"}, "u": {"$inc": {"balance_cents": "?"}}}]),
+    ([{"$match": {"user_id": "u1"}}, {"$group": {"_id": None, "total": {"$sum": "$balance_cents"}}}],
+     [{"$match": {"user_id": "?"}}, {"$group": {"_id": "?", "total": {"$sum": "?"}}}]),
+])
+def test_query_shape_strips_literals(value, shape):
+    assert query_shape(value) == shape
+
+
+def test_find_fingerprint_keeps_sort_verbatim():
+    command = {
+        "find": "transactions",
+        "filter": {"user_id": "u1", "timestamp": {"$lt": datetime(2024, 1, 1)}},
+        "sort": {"timestamp": -1, "id": -1},
+        "limit": 21,
+    }
+    assert json.loads(command_fingerprint("find", command)) == {
+        "filter": {"user_id": "?", "timestamp": {"$lt": "?"}},
+        "sort": {"timestamp": -1, "id": -1},
+    }
+
+
+@pytest.mark.parametrize("command_name, first, second", [
+    ("find",
+     {"filter": {"id": {"$in": ["a1"]}}, "sort": {"id": 1}},
+     {"filter": {"id": {"$in": ["b1", "b2", "b3"]}}, "sort": {"id": 1}}),
+    ("update",
+     {"updates": [{"q": {"id": "a1"}, "u": {"$inc": {"balance_cents": 100}}}]},
+     {"updates": [{"q": {"id": "b7"}, "u": {"$inc": {"balance_cents": -2500}}}] * 3}),
+    ("aggregate",
+     {"pipeline": [{"$match": {"timestamp": {"$gte": datetime(2024, 1, 1)}}}]},
+     {"pipeline": [{"$match": {"timestamp": {"$gte": datetime(2025, 6, 30)}}}]}),
+])
+def test_same_shape_gives_same_fingerprint(command_name, first, second):
+    assert command_fingerprint(command_name, first) == command_fingerprint(command_name, second)
+
+
+@pytest.mark.parametrize("command_name, first, second", [
+    ("find", {"filter": {"id": "a1"}}, {"filter": {"account_number": "a1"}}),
+    ("find", {"filter": {"id": "a1"}, "sort": {"id": 1}}, {"filter": {"id": "a1"}, "sort": {"id": -1}}),
+    ("distinct", {"key": "user_id", "query": {}}, {"key": "account_id", "query": {}}),
+])
+def test_different_shapes_give_different_fingerprints(command_name, first, second):
+    assert command_fingerprint(command_name, first) != command_fingerprint(command_name, second)
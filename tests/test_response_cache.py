@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from server import AsyncResponseCache
+
+
+class Computation:
+    """A compute() callable that counts its runs and finishes when released."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        result = self.results[min(self.calls, len(self.results)) - 1]
+        await self.release.wait()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_concurrent_misses_share_one_computation(run):
+    async def scenario():
+        cache, compute = AsyncResponseCache(ttl=60), Computation("stats")
+        waiters = [asyncio.ensure_future(cache.get_or_compute("stats", compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        compute.release.set()
+        assert await asyncio.gather(*waiters) == ["stats"] * 5
+        assert (compute.calls, cache.coalesced) == (1, 4)
+        assert await cache.get_or_compute("stats", compute) == "stats"
+        assert compute.calls == 1
+
+    run(scenario())
+
+
+def test_invalidate_during_computation_discards_its_result(run):
+    async def scenario():
+        cache, compute = AsyncResponseCache(ttl=60), Computation("before write", "after write")
+        stale = asyncio.ensure_future(cache.get_or_compute("stats", compute))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        compute.release.set()
+        # The caller that started before the write still gets its answer, but it is not cached
+        assert await stale == "before write"
+        assert await cache.get_or_compute("stats", compute) == "after write"
+        assert compute.calls == 2
+
+    run(scenario())
+
+
+def test_failed_computation_is_not_cached(run):
+    async def scenario():
+        cache, compute = AsyncResponseCache(ttl=60), Computation(RuntimeError("database down"), "stats")
+        compute.release.set()
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("stats", compute)
+        assert await cache.get_or_compute("stats", compute) == "stats"
+        assert compute.calls == 2
+
+    run(scenario())